@@ -0,0 +1,52 @@
+"""
+Time to delete an account (UserService.delete_user) as the user's workout history grows.
+With set-based deletes and ON DELETE CASCADE this stays roughly flat instead of growing with the
+number of ORM objects loaded. Needs the same Postgres setup as the test suite. Run from backend/:
+
+    python -m benchmarks.account_deletion
+
+Every run seeds a throwaway user inside a transaction that is rolled back afterwards.
+"""
+import asyncio
+from time import perf_counter
+from sqlalchemy import text
+
+from src.auth.service import UserService
+from src.db.db import Session, async_engine
+
+HISTORY_SIZES = (100, 1_000, 10_000, 100_000)
+
+
+async def time_delete_user(n_logs: int) -> float:
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        async with Session(bind=conn) as session:
+            uid = (await session.execute(text(
+                "INSERT INTO user_accounts (uid, username, email, password_hash, is_verified, account_creation_type) "
+                "VALUES (gen_random_uuid(), 'bench_user', 'bench_user@example.com', '', false, 'CUSTOM') "
+                "RETURNING uid"
+            ))).scalar_one()
+            await session.execute(text(
+                "WITH e AS (SELECT array_agg(eid) AS eids, count(*) AS n FROM exercises) "
+                "INSERT INTO workout_logs (wid, user_uid, exercise_eid, reps, weight, date_performed, created_at) "
+                "SELECT gen_random_uuid(), :uid, e.eids[1 + i % e.n], 1 + i % 12, 20 + (i * 7) % 300, "
+                "       date '2020-01-01' + i % 2000, timestamp '2020-01-01' + i * interval '1 second' "
+                "FROM e, generate_series(1, :rows) AS i"
+            ), {"uid": uid, "rows": n_logs})
+
+            # The session joins the outer transaction, so delete_user's commit is rolled back with it
+            start = perf_counter()
+            await UserService().delete_user(uid, session)
+            elapsed_s = perf_counter() - start
+        await trans.rollback()
+
+    return elapsed_s
+
+
+async def main():
+    for n_logs in HISTORY_SIZES:
+        elapsed_s = await time_delete_user(n_logs)
+        print(f"{n_logs} logs: delete_user took {elapsed_s * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
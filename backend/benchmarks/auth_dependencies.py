@@ -0,0 +1,88 @@
+"""
+Micro-benchmark of the per-request auth cost on a guarded route (RoleChecker + AccessTokenBearer).
+Counts JWT decodes, blocklist round-trips and principal lookups per request, plus the time spent in them.
+Needs the same Postgres/Redis setup (and seeded dev data) as the test suite. Run from backend/:
+
+    python -m benchmarks.auth_dependencies
+"""
+import asyncio
+import json
+import os
+from time import perf_counter
+from httpx import ASGITransport, AsyncClient
+
+import src.auth.dependencies as auth_dependencies
+from src.auth.cache import principal_cache
+from src.main import app
+
+N_REQUESTS = 200
+ROUTE = "/v1/exercise/all"
+SEED_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "tests", "seed_data.json")
+
+
+class CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.elapsed_s = 0.0
+
+def instrument_sync(fn, stats: CallStats):
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stats.calls += 1
+            stats.elapsed_s += perf_counter() - start
+    return wrapper
+
+def instrument_async(fn, stats: CallStats):
+    async def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            stats.calls += 1
+            stats.elapsed_s += perf_counter() - start
+    return wrapper
+
+
+async def run(client: AsyncClient, headers: dict, warm_cache: bool) -> dict:
+    stats = {"jwt_decode": CallStats(), "blocklist_check": CallStats(), "principal_lookup": CallStats()}
+    originals = (auth_dependencies.decode_validate_jwt,
+                 auth_dependencies.token_in_blocklist,
+                 auth_dependencies.user_service.get_principal_by_email)
+
+    auth_dependencies.decode_validate_jwt = instrument_sync(originals[0], stats["jwt_decode"])
+    auth_dependencies.token_in_blocklist = instrument_async(originals[1], stats["blocklist_check"])
+    auth_dependencies.user_service.get_principal_by_email = instrument_async(originals[2], stats["principal_lookup"])
+    try:
+        for _ in range(N_REQUESTS):
+            if not warm_cache:
+                principal_cache.clear()
+            res = await client.get(ROUTE, headers=headers)
+            assert res.status_code == 200, res.text
+    finally:
+        (auth_dependencies.decode_validate_jwt,
+         auth_dependencies.token_in_blocklist,
+         auth_dependencies.user_service.get_principal_by_email) = originals
+
+    report = {name: round(s.calls / N_REQUESTS, 2) for name, s in stats.items()}
+    report["auth_us_per_request"] = round(sum(s.elapsed_s for s in stats.values()) / N_REQUESTS * 1e6, 1)
+    return report
+
+
+async def main():
+    with open(SEED_DATA_PATH, "r") as f:
+        seed_user = json.load(f)["seed_users"][0]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://localhost") as client:
+        res = await client.post("/v1/user/login", json={"email": seed_user["email"], "password": seed_user["password"]})
+        headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+        for warm_cache in (False, True):
+            report = await run(client, headers, warm_cache)
+            print(f"{ROUTE} principal_cache={'warm' if warm_cache else 'cold'}: {report}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
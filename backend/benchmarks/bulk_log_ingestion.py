@@ -0,0 +1,64 @@
+"""
+Throughput of logging a workout set by set (POST /workout_log/) against one POST /workout_log/bulk request.
+Needs the same Postgres/Redis setup (and seeded dev data) as the test suite. Run from backend/:
+
+    python -m benchmarks.bulk_log_ingestion
+
+Logs are written on BENCH_DATE and removed again through DELETE /workout_log/day/{date}.
+"""
+import asyncio
+import json
+import os
+from time import perf_counter
+from uuid import uuid4
+from httpx import ASGITransport, AsyncClient
+
+from src.main import app
+
+SET_COUNTS = (10, 50, 200)
+BENCH_DATE = "1999-01-01"
+EXERCISE_SLUG = "bb-bench-press"
+SEED_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "tests", "seed_data.json")
+
+
+def make_sets(n: int) -> list[dict]:
+    return [{"exercise_slug": EXERCISE_SLUG, "reps": 1 + i % 12, "weight": 20 + i, "date_performed": BENCH_DATE}
+            for i in range(n)]
+
+async def per_set(client: AsyncClient, headers: dict, sets: list[dict]) -> float:
+    start = perf_counter()
+    for log in sets:
+        res = await client.post("/v1/workout_log/", json=log, headers=headers)
+        assert res.status_code == 201, res.text
+    return perf_counter() - start
+
+async def bulk(client: AsyncClient, headers: dict, sets: list[dict]) -> float:
+    start = perf_counter()
+    res = await client.post("/v1/workout_log/bulk", json={"logs": sets, "batch_id": str(uuid4())}, headers=headers)
+    assert res.status_code == 201, res.text
+    assert len(res.json()["created"]) == len(sets)
+    return perf_counter() - start
+
+
+async def main():
+    with open(SEED_DATA_PATH, "r") as f:
+        seed_user = json.load(f)["seed_users"][0]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://localhost") as client:
+        res = await client.post("/v1/user/login", json={"email": seed_user["email"], "password": seed_user["password"]})
+        headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+        for n in SET_COUNTS:
+            sets = make_sets(n)
+            report = {}
+            for name, ingest in (("per_set", per_set), ("bulk", bulk)):
+                elapsed_s = await ingest(client, headers, sets)
+                report[f"{name}_sets_per_s"] = round(n / elapsed_s, 1)
+                res = await client.delete(f"/v1/workout_log/day/{BENCH_DATE}", headers=headers)
+                assert res.status_code == 204, res.text
+            report["speedup"] = round(report["bulk_sets_per_s"] / report["per_set_sets_per_s"], 1)
+            print(f"{n} sets: {report}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+CPU embedding variants (torch fp32, ONNX fp32, ONNX dynamic int8, OpenVINO) against the torch fp32 model:
+encode throughput on documents sampled from the existing Chroma collections, and recall@k of query search,
+i.e. the share of the fp32 model's top k chunks that each variant's query vectors also retrieve. Needs the
+ML dependencies and a populated CHROMA_VDB_PATH. Run from backend/:
+
+    python -m benchmarks.embedder_cpu [--threads 8]
+"""
+import argparse
+from time import perf_counter
+import chromadb
+import numpy as np
+
+from src.config import Config
+from src.ingestion.utils import ChromaDBLocalGPUEmbedder
+from src.rag.retriever import QUERY_INSTRUCTION
+
+COLLECTIONS = ("yt_transcripts", "txtbks")
+VARIANTS = {
+    "torch_fp32": dict(cpu_backend="torch"),
+    "onnx_fp32": dict(cpu_backend="onnx", quantize=False),
+    "onnx_int8": dict(cpu_backend="onnx", quantize=True),
+    "openvino_fp32": dict(cpu_backend="openvino"),
+}
+QUERIES = [
+    "optimal amount of required protein",
+    "exercise best range of motion",
+    "increasing performance and building strength",
+    "exercises and training methods for chest",
+    "training volume and sets per muscle per week",
+    "rest periods between sets for muscle growth",
+    "training to failure and proximity to failure",
+    "deload frequency and recovery from training fatigue",
+    "lengthened partials and stretch-mediated hypertrophy",
+    "cardio interference with strength and muscle gains",
+    "sleep and recovery for muscle growth",
+    "creatine supplementation benefits and dosing",
+]
+N_DOCUMENTS = 256
+K = 10
+
+
+def encode_throughput(embedder, documents: list[str]) -> float:
+    embedder(documents[:8]) # warm up (graph optimization, JIT)
+    start = perf_counter()
+    embedder(documents)
+    return round(len(documents) / (perf_counter() - start), 1)
+
+def top_k_ids(collection, query_embeddings) -> list[set]:
+    res = collection.query(query_embeddings=query_embeddings, n_results=K, include=[])
+    return [set(ids) for ids in res["ids"]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=Config.EMBED_CPU_THREADS or None)
+    args = parser.parse_args()
+
+    client = chromadb.PersistentClient(path=Config.CHROMA_VDB_PATH)
+    collections = {name: client.get_collection(name) for name in COLLECTIONS}
+    documents = [doc for collection in collections.values()
+                 for doc in collection.get(limit=N_DOCUMENTS // len(COLLECTIONS), include=["documents"])["documents"]]
+    query_texts = [QUERY_INSTRUCTION + query for query in QUERIES]
+
+    reference = None
+    for name, options in VARIANTS.items():
+        embedder = ChromaDBLocalGPUEmbedder(Config.HF_EMBED_MODEL_NAME, device="cpu", batch_size=16,
+                                            cpu_threads=args.threads, **options)
+        # A variant whose backend failed to load fell back to torch fp32
+        if options["cpu_backend"] != "torch" and embedder.model_id == Config.HF_EMBED_MODEL_NAME:
+            print(f"{name}: backend unavailable, skipped")
+            continue
+
+        query_embeddings = np.asarray(embedder(query_texts), dtype=np.float32)
+        retrieved = {collection: top_k_ids(collections[collection], query_embeddings) for collection in COLLECTIONS}
+        if reference is None:
+            reference = retrieved
+
+        recall = {f"recall@{K}_{collection}": round(float(np.mean([len(got & want) / len(want)
+                                                                   for got, want in zip(retrieved[collection], reference[collection])
+                                                                   if want])), 3)
+                  for collection in COLLECTIONS}
+        report = {"model_id": embedder.model_id, "docs_per_s": encode_throughput(embedder, documents), **recall}
+        print(f"{name}: {report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Embedding throughput when ingesting documents: the previous behaviour (batches of 2, each converted to
+Python lists and concatenated) against fixed batch sizes and the memory based auto batch size, on chunks
+from the existing Chroma collections. Needs the ML dependencies and a populated CHROMA_VDB_PATH. Run from
+backend/:
+
+    python -m benchmarks.embedding_ingestion
+"""
+from time import perf_counter
+import chromadb
+import numpy as np
+
+from src.config import Config
+from src.ingestion.utils import ChromaDBLocalGPUEmbedder
+
+COLLECTIONS = ("txtbks", "yt_transcripts")
+N_DOCUMENTS = 1024
+BATCH_SIZES = (2, 16, 64, None) # None: auto
+
+
+def previous_encode(embedder: ChromaDBLocalGPUEmbedder, documents: list[str]) -> list:
+    all_embeddings = []
+    for i in range(0, len(documents), 2):
+        all_embeddings += embedder.model.encode(documents[i:i + 2], convert_to_numpy=True).tolist()
+    return all_embeddings
+
+def docs_per_s(fn, documents: list[str]):
+    fn(documents[:8]) # warm up
+    start = perf_counter()
+    result = fn(documents)
+    return round(len(documents) / (perf_counter() - start), 1), result
+
+
+def main():
+    client = chromadb.PersistentClient(path=Config.CHROMA_VDB_PATH)
+    documents = [doc for name in COLLECTIONS
+                 for doc in client.get_collection(name).get(limit=N_DOCUMENTS // len(COLLECTIONS),
+                                                            include=["documents"])["documents"]]
+    embedder = ChromaDBLocalGPUEmbedder.from_config(quantize=False)
+    print(f"{len(documents)} documents, {embedder.model_id} on {embedder.device}")
+
+    rate, reference = docs_per_s(lambda docs: previous_encode(embedder, docs), documents)
+    print(f"previous (batch 2 + tolist): {rate} docs/s")
+    reference = np.asarray(reference, dtype=np.float32)
+
+    for batch_size in BATCH_SIZES:
+        embedder.batch_size = batch_size
+        rate, embeddings = docs_per_s(embedder, documents)
+        report = {
+            "batch_size": batch_size or embedder._batch_size_for(documents),
+            "docs_per_s": rate,
+            # Padding to a batch's longest text may shift values slightly, never meaningfully
+            "max_abs_diff": float(np.abs(embeddings - reference).max()),
+        }
+        print(f"{'auto' if batch_size is None else batch_size}: {report}")
+
+if __name__ == "__main__":
+    main()
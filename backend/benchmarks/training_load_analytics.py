@@ -0,0 +1,49 @@
+"""
+Cost of the vectorized training metrics (src/analytics/training_load.py) on large synthetic histories.
+Pure NumPy, no database needed. Run from backend/:
+
+    python -m benchmarks.training_load_analytics
+"""
+from datetime import date
+from time import perf_counter
+import numpy as np
+
+from src.analytics.training_load import E1RM_FORMULAS, LogArrays, best_e1rm_by_day, training_load, training_summary
+
+HISTORY_SIZES = (1_000, 10_000, 100_000)
+SETS_PER_DAY = 15
+N_REPEATS = 20
+
+
+def synthetic_rows(n_logs: int) -> list[tuple[int, float, float]]:
+    rng = np.random.default_rng(0)
+    last_day = int(np.datetime64(date.today(), "D").astype(np.int64))
+    days = last_day - np.arange(n_logs)[::-1] // SETS_PER_DAY
+    reps = rng.integers(1, 15, n_logs).astype(float)
+    weight = rng.integers(20, 300, n_logs).astype(float)
+    return list(zip(days.tolist(), reps.tolist(), weight.tolist()))
+
+def time_ms(fn) -> float:
+    start = perf_counter()
+    for _ in range(N_REPEATS):
+        fn()
+    return round((perf_counter() - start) / N_REPEATS * 1000, 3)
+
+
+def main():
+    formulas = list(E1RM_FORMULAS)
+    for n_logs in HISTORY_SIZES:
+        rows = synthetic_rows(n_logs)
+        logs = LogArrays.from_rows(rows)
+        first_day, last_day = int(logs.days.min()), int(logs.days.max())
+
+        report = {
+            "from_rows_ms": time_ms(lambda: LogArrays.from_rows(rows)),
+            "e1rm_all_formulas_ms": time_ms(lambda: best_e1rm_by_day(logs, formulas)),
+            "training_load_ms": time_ms(lambda: training_load(logs.days, logs.volume, first_day, last_day)),
+            "training_summary_ms": time_ms(lambda: training_summary(logs.days, logs.volume, date.today())),
+        }
+        print(f"{n_logs} logs over {last_day - first_day + 1} days: {report}")
+
+if __name__ == "__main__":
+    main()
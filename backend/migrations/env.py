@@ -12,6 +12,8 @@ from src.exercise.models import Exercise
 from src.workout_logs.models import WorkoutLog
 from src.auth.models import User
 from src.rag.models import ResearchResult
+from src.personal_records.models import PersonalRecord
+from src.daily_rollups.models import WorkoutDailyRollup
 
 database_url = Config.DATABASE_URL
 
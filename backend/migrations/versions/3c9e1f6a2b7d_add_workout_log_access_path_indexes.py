@@ -0,0 +1,46 @@
+"""Add workout log access path indexes
+
+Revision ID: 3c9e1f6a2b7d
+Revises: ffbaf8aa1ad3
+Create Date: 2026-10-17 10:12:41.502318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e1f6a2b7d'
+down_revision: Union[str, None] = 'ffbaf8aa1ad3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside the migration transaction, and avoids locking writes on a large table
+    with op.get_context().autocommit_block():
+        op.create_index('ix_workout_logs_user_date', 'workout_logs',
+                        ['user_uid', 'date_performed'],
+                        postgresql_include=['exercise_eid', 'reps', 'weight'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_workout_logs_user_exercise_weight', 'workout_logs',
+                        ['user_uid', 'exercise_eid', sa.text('weight DESC'), sa.text('date_performed DESC')],
+                        postgresql_include=['reps'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_workout_logs_date_performed', 'workout_logs',
+                        ['date_performed'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_workout_logs_date_performed', table_name='workout_logs',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_workout_logs_user_exercise_weight', table_name='workout_logs',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_workout_logs_user_date', table_name='workout_logs',
+                      postgresql_concurrently=True, if_exists=True)
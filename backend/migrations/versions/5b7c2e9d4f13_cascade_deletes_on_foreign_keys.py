@@ -0,0 +1,47 @@
+"""Cascade deletes on foreign keys
+
+Revision ID: 5b7c2e9d4f13
+Revises: 8d2f4b7e1a90
+Create Date: 2026-10-17 12:20:47.631905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7c2e9d4f13'
+down_revision: Union[str, None] = '8d2f4b7e1a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (constraint, source table, referent table, local column, remote column)
+FOREIGN_KEYS = (
+    ('workout_logs_user_uid_fkey', 'workout_logs', 'user_accounts', 'user_uid', 'uid'),
+    ('workout_logs_exercise_eid_fkey', 'workout_logs', 'exercises', 'exercise_eid', 'eid'),
+    ('research_results_user_uid_fkey', 'research_results', 'user_accounts', 'user_uid', 'uid'),
+    ('exercise_tags_eid_fkey', 'exercise_tags', 'exercises', 'eid', 'eid'),
+    ('exercise_tags_tid_fkey', 'exercise_tags', 'tags', 'tid', 'tid'),
+)
+
+
+def recreate_foreign_keys(ondelete: Union[str, None]) -> None:
+    for name, source, referent, local_col, remote_col in FOREIGN_KEYS:
+        op.drop_constraint(name, source, type_='foreignkey')
+        # NOT VALID skips the full table check while the table is locked, it is validated below
+        op.create_foreign_key(name, source, referent, [local_col], [remote_col],
+                              ondelete=ondelete, postgresql_not_valid=True)
+    for name, source, *_ in FOREIGN_KEYS:
+        op.execute(sa.text(f'ALTER TABLE {source} VALIDATE CONSTRAINT {name}'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    recreate_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    recreate_foreign_keys(None)
@@ -0,0 +1,86 @@
+"""Add personal_records table
+
+Revision ID: 8d2f4b7e1a90
+Revises: 3c9e1f6a2b7d
+Create Date: 2026-10-17 11:03:26.918744
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4b7e1a90'
+down_revision: Union[str, None] = '3c9e1f6a2b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same rules as PersonalRecordService: ties go to the latest log, e1RM is Epley
+BACKFILL_SQL = """
+WITH heaviest AS (
+    SELECT DISTINCT ON (user_uid, exercise_eid) user_uid, exercise_eid, wid, weight, reps, date_performed
+    FROM workout_logs
+    ORDER BY user_uid, exercise_eid, weight DESC, date_performed DESC
+),
+best_e1rm AS (
+    SELECT DISTINCT ON (user_uid, exercise_eid) user_uid, exercise_eid, wid, weight, reps, date_performed,
+           CASE WHEN reps <= 1 THEN weight ELSE weight * (1 + reps / 30) END AS e1rm
+    FROM workout_logs
+    ORDER BY user_uid, exercise_eid, e1rm DESC, date_performed DESC
+),
+rep_records AS (
+    SELECT user_uid, exercise_eid,
+           jsonb_object_agg(weight::numeric::text, jsonb_build_object(
+               'reps', reps, 'date_performed', date_performed, 'wid', wid)) AS rep_records
+    FROM (
+        SELECT DISTINCT ON (user_uid, exercise_eid, weight) user_uid, exercise_eid, weight, reps, date_performed, wid
+        FROM workout_logs
+        ORDER BY user_uid, exercise_eid, weight, reps DESC, date_performed DESC
+    ) AS most_reps
+    GROUP BY user_uid, exercise_eid
+)
+INSERT INTO personal_records (
+    user_uid, exercise_eid,
+    max_weight, max_weight_reps, max_weight_date, max_weight_wid,
+    best_e1rm, best_e1rm_weight, best_e1rm_reps, best_e1rm_date, best_e1rm_wid,
+    rep_records
+)
+SELECT h.user_uid, h.exercise_eid,
+       h.weight, h.reps, h.date_performed, h.wid,
+       b.e1rm, b.weight, b.reps, b.date_performed, b.wid,
+       r.rep_records
+FROM heaviest h
+JOIN best_e1rm b USING (user_uid, exercise_eid)
+JOIN rep_records r USING (user_uid, exercise_eid)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('personal_records',
+    sa.Column('user_uid', sa.UUID(), nullable=False),
+    sa.Column('exercise_eid', sa.UUID(), nullable=False),
+    sa.Column('max_weight', sa.Float(), nullable=True),
+    sa.Column('max_weight_reps', sa.Float(), nullable=True),
+    sa.Column('max_weight_date', sa.Date(), nullable=True),
+    sa.Column('max_weight_wid', sa.UUID(), nullable=True),
+    sa.Column('best_e1rm', sa.Float(), nullable=True),
+    sa.Column('best_e1rm_weight', sa.Float(), nullable=True),
+    sa.Column('best_e1rm_reps', sa.Float(), nullable=True),
+    sa.Column('best_e1rm_date', sa.Date(), nullable=True),
+    sa.Column('best_e1rm_wid', sa.UUID(), nullable=True),
+    sa.Column('rep_records', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['exercise_eid'], ['exercises.eid'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_uid'], ['user_accounts.uid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_uid', 'exercise_eid')
+    )
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('personal_records')
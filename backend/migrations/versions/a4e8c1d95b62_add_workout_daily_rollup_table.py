@@ -0,0 +1,54 @@
+"""Add workout_daily_rollup table
+
+Revision ID: a4e8c1d95b62
+Revises: 5b7c2e9d4f13
+Create Date: 2026-10-17 13:41:09.274553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e8c1d95b62'
+down_revision: Union[str, None] = '5b7c2e9d4f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same aggregation as DailyRollupService
+BACKFILL_SQL = """
+INSERT INTO workout_daily_rollup (
+    user_uid, exercise_eid, day, total_sets, total_reps, total_volume, max_weight, max_weight_reps
+)
+SELECT user_uid, exercise_eid, date_performed, count(*), sum(reps), sum(reps * weight), max(weight),
+       (array_agg(reps ORDER BY weight DESC, reps DESC))[1]
+FROM workout_logs
+GROUP BY user_uid, exercise_eid, date_performed
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('workout_daily_rollup',
+    sa.Column('user_uid', sa.UUID(), nullable=False),
+    sa.Column('exercise_eid', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total_sets', sa.Integer(), nullable=False),
+    sa.Column('total_reps', sa.Float(), nullable=False),
+    sa.Column('total_volume', sa.Float(), nullable=False),
+    sa.Column('max_weight', sa.Float(), nullable=False),
+    sa.Column('max_weight_reps', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['exercise_eid'], ['exercises.eid'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_uid'], ['user_accounts.uid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_uid', 'exercise_eid', 'day')
+    )
+    op.create_index('ix_workout_daily_rollup_user_day', 'workout_daily_rollup', ['user_uid', 'day'])
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_workout_daily_rollup_user_day', table_name='workout_daily_rollup')
+    op.drop_table('workout_daily_rollup')
@@ -0,0 +1,42 @@
+"""Add exercise_eid indexes for cascading deletes
+
+Revision ID: c7d3a2f1e8b4
+Revises: a4e8c1d95b62
+Create Date: 2026-10-17 19:05:32.417086
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3a2f1e8b4'
+down_revision: Union[str, None] = 'a4e8c1d95b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ON DELETE CASCADE looks the referencing rows up by the foreign key column. Without an index leading on it,
+# deleting an exercise (or a tag) scans every table referencing it
+INDEXES = (
+    ('ix_workout_logs_exercise_eid', 'workout_logs', 'exercise_eid'),
+    ('ix_personal_records_exercise_eid', 'personal_records', 'exercise_eid'),
+    ('ix_workout_daily_rollup_exercise_eid', 'workout_daily_rollup', 'exercise_eid'),
+    ('ix_exercise_tags_tid', 'exercise_tags', 'tid'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside the migration transaction, and avoids locking writes on a large table
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(name, table, [column], postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
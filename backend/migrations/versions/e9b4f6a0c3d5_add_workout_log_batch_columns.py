@@ -0,0 +1,39 @@
+"""Add workout log batch columns
+
+Revision ID: e9b4f6a0c3d5
+Revises: c7d3a2f1e8b4
+Create Date: 2026-10-17 21:14:08.536271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b4f6a0c3d5'
+down_revision: Union[str, None] = 'c7d3a2f1e8b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable columns without a default, adding them does not rewrite the table
+    op.add_column('workout_logs', sa.Column('batch_id', sa.UUID(), nullable=True))
+    op.add_column('workout_logs', sa.Column('batch_position', sa.Integer(), nullable=True))
+    # CONCURRENTLY cannot run inside the migration transaction, and avoids locking writes on a large table
+    with op.get_context().autocommit_block():
+        op.create_index('ux_workout_logs_batch_position', 'workout_logs',
+                        ['user_uid', 'batch_id', 'batch_position'], unique=True,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ux_workout_logs_batch_position', table_name='workout_logs',
+                      postgresql_concurrently=True, if_exists=True)
+    op.drop_column('workout_logs', 'batch_position')
+    op.drop_column('workout_logs', 'batch_id')
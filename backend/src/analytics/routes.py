@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.exceptions import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.analytics.schemas import WeeklyVolumeResponse, E1RMResponse, TrainingLoadResponse
+from src.analytics.service import AnalyticsService
+from src.analytics.training_load import E1RM_FORMULAS, best_e1rm_by_day, training_load, to_day, to_dates, \
+    to_json_floats
+from src.auth.dependencies import access_token_bearer, RoleChecker
+from src.db.db import get_session
+from datetime import date, timedelta
+from typing import List, Literal
+from uuid import UUID
+
+analytics_router = APIRouter()
+analytics_service = AnalyticsService()
+role_checker = RoleChecker(["user", "admin"])
+
+DEFAULT_RANGE_DAYS = 365
+
+
+# Progress charts of the beared user, defaults to the last year
+@analytics_router.get("/weekly", response_model=WeeklyVolumeResponse, dependencies=[Depends(role_checker)])
+async def get_weekly_volume(
+    group_by: Literal["exercise", "tag"] = "exercise",
+    start: date | None = None,
+    end: date | None = None,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)
+):
+    end = end or date.today()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end.")
+
+    uid = UUID(token_details["user"]["uid"])
+    return await analytics_service.get_weekly_volume(group_by, uid, start, end, session)
+
+
+# Best estimated 1RM of each training day of one exercise, per formula
+@analytics_router.get("/e1rm", response_model=E1RMResponse, dependencies=[Depends(role_checker)])
+async def get_e1rm(
+    exercise_slug: str,
+    formula: List[str] = Query(["epley"]),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)
+):
+    unknown = [f for f in formula if f not in E1RM_FORMULAS]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown formula: {', '.join(unknown)}. Available: {', '.join(E1RM_FORMULAS)}")
+
+    uid = UUID(token_details["user"]["uid"])
+    logs = await analytics_service.get_log_arrays(uid, session, exercise_slug)
+    e1rm = best_e1rm_by_day(logs, formula)
+
+    return {
+        "exercise_slug" : exercise_slug,
+        "day" : to_dates(e1rm.pop("days")),
+        "e1rm" : {f: to_json_floats(values) for f, values in e1rm.items()},
+    }
+
+
+# Daily volume and acute:chronic workload ratio, over all exercises unless one is given
+@analytics_router.get("/training_load", response_model=TrainingLoadResponse, dependencies=[Depends(role_checker)])
+async def get_training_load(
+    exercise_slug: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)
+):
+    end = end or date.today()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end.")
+
+    uid = UUID(token_details["user"]["uid"])
+    days, volume = await analytics_service.get_daily_volume(uid, session, exercise_slug)
+    load = training_load(days, volume, to_day(start), to_day(end))
+
+    return {
+        "exercise_slug" : exercise_slug,
+        "day" : to_dates(load["days"]),
+        "volume" : load["volume"].tolist(),
+        "acute" : load["acute"].tolist(),
+        "chronic" : load["chronic"].tolist(),
+        "acwr" : to_json_floats(load["acwr"]),
+    }
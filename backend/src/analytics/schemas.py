@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Dict, List, Literal
+
+
+class WeeklySeries(BaseModel):
+    # Parallel arrays, index i of every column describes week[i]
+    key: str
+    week: List[date]
+    sets: List[int]
+    reps: List[float]
+    volume: List[float]
+    top_weight: List[float]
+    top_reps: List[float]
+
+class WeeklyVolumeResponse(BaseModel):
+    group_by: Literal["exercise", "tag"]
+    start: date
+    end: date
+    series: List[WeeklySeries]
+
+class E1RMResponse(BaseModel):
+    exercise_slug: str
+    day: List[date]
+    # Best e1RM of each training day per formula, null where the formula is undefined for every set
+    e1rm: Dict[str, List[float | None]]
+
+class TrainingLoadResponse(BaseModel):
+    exercise_slug: str | None = None
+    day: List[date]
+    volume: List[float]
+    # Rolling 7 and 28 day average daily volume, and their ratio (null while the chronic load is 0)
+    acute: List[float]
+    chronic: List[float]
+    acwr: List[float | None]
+
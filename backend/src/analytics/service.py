@@ -0,0 +1,94 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, cast, Date
+from src.workout_logs.models import WorkoutLog
+from src.exercise.models import Exercise
+from src.tags.models import Tag, exercise_tags
+from src.daily_rollups.models import WorkoutDailyRollup
+from src.analytics.training_load import LogArrays, volume_arrays_from_rows
+from datetime import date
+from itertools import groupby
+from uuid import UUID
+from typing import Literal
+import numpy as np
+
+EPOCH = date(1970, 1, 1)
+
+
+class AnalyticsService:
+    @staticmethod
+    def _weekly_statement(group_by: Literal["exercise", "tag"], uid: UUID, start: date, end: date):
+        # Reads the daily rollup, so the rows scanned grow with days trained rather than sets logged
+        week = cast(func.date_trunc("week", WorkoutDailyRollup.day), Date)
+        ranked = select(WorkoutDailyRollup.total_sets,
+                        WorkoutDailyRollup.total_reps,
+                        WorkoutDailyRollup.total_volume,
+                        WorkoutDailyRollup.max_weight,
+                        WorkoutDailyRollup.max_weight_reps,
+                        week.label("week"))\
+            .where(WorkoutDailyRollup.user_uid == uid, WorkoutDailyRollup.day.between(start, end))
+
+        # A day counts once for its exercise, and once for each tag of its exercise
+        if group_by == "exercise":
+            key = Exercise.exercise_slug
+            ranked = ranked.join(Exercise, Exercise.eid == WorkoutDailyRollup.exercise_eid)
+        else:
+            key = Tag.tag_name
+            ranked = ranked.join(exercise_tags, exercise_tags.c.eid == WorkoutDailyRollup.exercise_eid)\
+                .join(Tag, Tag.tid == exercise_tags.c.tid)
+
+        # Top set of each week: heaviest, then most reps at that weight
+        ranked = ranked.add_columns(
+            key.label("key"),
+            func.row_number().over(partition_by=(key, week),
+                                   order_by=(WorkoutDailyRollup.max_weight.desc(),
+                                             WorkoutDailyRollup.max_weight_reps.desc())).label("rank")
+        ).subquery()
+
+        is_top = ranked.c.rank == 1
+        return select(ranked.c.key,
+                      ranked.c.week,
+                      func.sum(ranked.c.total_sets).label("sets"),
+                      func.sum(ranked.c.total_reps).label("reps"),
+                      func.sum(ranked.c.total_volume).label("volume"),
+                      func.max(case((is_top, ranked.c.max_weight))).label("top_weight"),
+                      func.max(case((is_top, ranked.c.max_weight_reps))).label("top_reps"))\
+            .group_by(ranked.c.key, ranked.c.week)\
+            .order_by(ranked.c.key, ranked.c.week)
+
+    async def get_weekly_volume(self, group_by: Literal["exercise", "tag"], uid: UUID,
+                                start: date, end: date, session: AsyncSession) -> dict:
+        """ Weekly sets, reps, volume (reps x weight) and top set per exercise or tag, as columnar series """
+        result = await session.execute(self._weekly_statement(group_by, uid, start, end))
+
+        columns = ("week", "sets", "reps", "volume", "top_weight", "top_reps")
+        series = []
+        for key, rows in groupby(result, key=lambda row: row.key):
+            rows = list(rows)
+            series.append({"key": key} | {column: [getattr(row, column) for row in rows] for column in columns})
+
+        return {"group_by": group_by, "start": start, "end": end, "series": series}
+
+    async def get_log_arrays(self, uid: UUID, session: AsyncSession, exercise_slug: str | None = None) -> LogArrays:
+        """ A user's logs (optionally of one exercise) as columnar arrays, dates as days since the epoch """
+        statement = select(WorkoutLog.date_performed - EPOCH, WorkoutLog.reps, WorkoutLog.weight)\
+            .where(WorkoutLog.user_uid == uid)
+        if exercise_slug:
+            statement = statement.join(Exercise, Exercise.eid == WorkoutLog.exercise_eid)\
+                .where(Exercise.exercise_slug == exercise_slug)
+        result = await session.execute(statement)
+
+        return LogArrays.from_rows(result.tuples().all())
+
+    async def get_daily_volume(self, uid: UUID, session: AsyncSession,
+                               exercise_slug: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """ (days since the epoch, volume) of every day the user trained, read from the daily rollup """
+        statement = select(WorkoutDailyRollup.day - EPOCH, func.sum(WorkoutDailyRollup.total_volume))\
+            .where(WorkoutDailyRollup.user_uid == uid)\
+            .group_by(WorkoutDailyRollup.day)
+        if exercise_slug:
+            statement = statement.join(Exercise, Exercise.eid == WorkoutDailyRollup.exercise_eid)\
+                .where(Exercise.exercise_slug == exercise_slug)
+        result = await session.execute(statement)
+
+        return volume_arrays_from_rows(result.tuples().all())
+
@@ -0,0 +1,131 @@
+"""
+Derived training metrics computed on a user's logs as columnar NumPy arrays, so the cost is a few
+vectorized passes over the history rather than Python loops over log objects.
+Days are integers (days since 1970-01-01) throughout, see to_dates() for converting them back.
+"""
+from dataclasses import dataclass
+from datetime import date
+import numpy as np
+
+ACUTE_WINDOW_DAYS = 7
+CHRONIC_WINDOW_DAYS = 28
+
+# Estimated one rep max from a set of `reps` at `weight`
+E1RM_FORMULAS = {
+    "epley": lambda weight, reps: weight * (1 + reps / 30),
+    "brzycki": lambda weight, reps: weight * 36 / (37 - reps),
+    "lander": lambda weight, reps: 100 * weight / (101.3 - 2.67123 * reps),
+    "lombardi": lambda weight, reps: weight * reps ** 0.10,
+    "mayhew": lambda weight, reps: 100 * weight / (52.2 + 41.9 * np.exp(-0.055 * reps)),
+    "oconner": lambda weight, reps: weight * (1 + reps / 40),
+    "wathan": lambda weight, reps: 100 * weight / (48.8 + 53.8 * np.exp(-0.075 * reps)),
+}
+
+
+@dataclass(frozen=True)
+class LogArrays:
+    days: np.ndarray # int64
+    reps: np.ndarray # float64
+    weight: np.ndarray # float64
+
+    @classmethod
+    def from_rows(cls, rows) -> "LogArrays":
+        """ Builds the arrays from (day, reps, weight) rows, see AnalyticsService.get_log_arrays """
+        data = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        return cls(days=data[:, 0].astype(np.int64), reps=data[:, 1], weight=data[:, 2])
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.reps * self.weight
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+
+def volume_arrays_from_rows(rows) -> tuple[np.ndarray, np.ndarray]:
+    """ (days, volume) arrays from (day, volume) rows, e.g. daily rollup totals """
+    data = np.array(rows, dtype=np.float64).reshape(-1, 2)
+    return data[:, 0].astype(np.int64), data[:, 1]
+
+
+def to_day(value: date) -> int:
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+def to_dates(days: np.ndarray) -> list[date]:
+    return np.asarray(days, dtype=np.int64).astype("datetime64[D]").tolist()
+
+def to_json_floats(values: np.ndarray) -> list[float | None]:
+    # NaN is not valid JSON, undefined values are sent as null
+    return [None if np.isnan(v) else v for v in values.tolist()]
+
+
+def estimate_1rm(weight: np.ndarray, reps: np.ndarray, formula: str = "epley") -> np.ndarray:
+    """ Per set e1RM, NaN where the formula is undefined (e.g. Brzycki from 37 reps on) """
+    weight = np.asarray(weight, dtype=np.float64)
+    reps = np.asarray(reps, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        e1rm = E1RM_FORMULAS[formula](weight, reps)
+    # A single is its own 1RM, the same rule as the personal records table
+    e1rm = np.where(reps <= 1, weight, e1rm)
+    return np.where(np.isfinite(e1rm) & (e1rm > 0), e1rm, np.nan)
+
+def daily_max(days: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ (unique days, max of values per day), NaN values are ignored """
+    if len(days) == 0:
+        return np.empty(0, np.int64), np.empty(0)
+    order = np.argsort(days, kind="stable")
+    days, values = days[order], values[order]
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    return days[starts], np.fmax.reduceat(values, starts)
+
+def daily_volume(days: np.ndarray, volume: np.ndarray, first_day: int, last_day: int) -> np.ndarray:
+    """ Total volume of every calendar day in [first_day, last_day] from per set or per day volumes, rest days are 0 """
+    in_range = (days >= first_day) & (days <= last_day)
+    return np.bincount(days[in_range] - first_day, weights=volume[in_range], minlength=last_day - first_day + 1)
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """ Trailing sum over `window` entries, the first window - 1 entries sum what is available """
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    end = np.arange(1, len(values) + 1)
+    return cumsum[end] - cumsum[np.maximum(end - window, 0)]
+
+def training_load(days: np.ndarray, volume: np.ndarray, first_day: int, last_day: int) -> dict[str, np.ndarray]:
+    """
+    Daily volume with its rolling acute (7 day) and chronic (28 day) averages and their ratio, the
+    acute:chronic workload ratio (ACWR). Days before first_day still feed the rolling windows.
+    """
+    history_start = first_day - CHRONIC_WINDOW_DAYS + 1
+    volume = daily_volume(days, volume, history_start, last_day)
+
+    acute = rolling_sum(volume, ACUTE_WINDOW_DAYS) / ACUTE_WINDOW_DAYS
+    chronic = rolling_sum(volume, CHRONIC_WINDOW_DAYS) / CHRONIC_WINDOW_DAYS
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+
+    offset = first_day - history_start
+    return {
+        "days": np.arange(first_day, last_day + 1),
+        "volume": volume[offset:],
+        "acute": acute[offset:],
+        "chronic": chronic[offset:],
+        "acwr": acwr[offset:],
+    }
+
+def best_e1rm_by_day(logs: LogArrays, formulas: list[str]) -> dict:
+    """ Best e1RM of each training day for every requested formula """
+    result = {"days": np.unique(logs.days)}
+    for formula in formulas:
+        _, result[formula] = daily_max(logs.days, estimate_1rm(logs.weight, logs.reps, formula))
+    return result
+
+def training_summary(days: np.ndarray, volume: np.ndarray, today: date) -> dict:
+    """ Current load figures as plain numbers, small enough to hand to an LLM as user context """
+    day = to_day(today)
+    load = training_load(days, volume, day, day)
+    acwr = load["acwr"][-1]
+    return {
+        "days_trained": len(np.unique(days)),
+        "volume_last_7_days": round(float(load["acute"][-1] * ACUTE_WINDOW_DAYS), 1),
+        "avg_weekly_volume_last_28_days": round(float(load["chronic"][-1] * ACUTE_WINDOW_DAYS), 1),
+        "acute_chronic_workload_ratio": None if np.isnan(acwr) else round(float(acwr), 2),
+    }
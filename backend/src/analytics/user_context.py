@@ -0,0 +1,203 @@
+# Compact, cached summary of a user's training history for LLM prompts (see Retriever.get_user_data)
+import json
+import logging
+from datetime import date, timedelta
+from time import perf_counter
+from uuid import UUID
+import redis.asyncio as redis
+from sqlalchemy import select, func, cast, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.analytics.service import AnalyticsService
+from src.analytics.training_load import training_summary
+from src.daily_rollups.models import WorkoutDailyRollup
+from src.personal_records.models import PersonalRecord
+from src.exercise.models import Exercise
+from src.exercise.cache import CATALOGUE_VERSION_KEY
+from src.tags.models import Tag, exercise_tags
+from src.db.redis_cache import redis_client
+from src.config import Config
+
+USER_CONTEXT_VERSION_KEY = "user_context:version" # bumped by writes touching many users
+
+MAX_RECENT_TOP_SETS = 12
+MAX_PERSONAL_RECORDS = 10
+MAX_TREND_TAGS = 6
+TREND_WEEKS = 8
+
+# Rough size of a token in characters, JSON full of dates and numbers tokenizes denser than prose
+CHARS_PER_TOKEN = 3
+
+analytics_service = AnalyticsService()
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def dump_context(summary: dict) -> str:
+    return json.dumps(summary, separators=(",", ":"), default=str)
+
+def fit_to_budget(summary: dict, token_budget: int) -> dict:
+    """
+    Drops the least relevant entries (oldest sets and records, lowest volume tags) from whichever list is
+    longest until the serialized summary fits the budget. Lists are expected most relevant first.
+    """
+    trend = summary["weekly_volume_by_tag"]["tags"]
+    lists = (summary["recent_top_sets"], summary["personal_records"], trend)
+    while estimate_tokens(dump_context(summary)) > token_budget:
+        longest = max(lists, key=len)
+        if not longest:
+            break
+        if longest is trend:
+            trend.popitem()
+        else:
+            longest.pop()
+    return summary
+
+
+def _user_key(uid: UUID) -> str:
+    return f"user_context:{uid}"
+
+def _user_version_key(uid: UUID) -> str:
+    return f"user_context:{uid}:version"
+
+
+class UserContextCache:
+    """
+    The summary is built from aggregates (the daily rollup and personal_records), so its size and cost are
+    bounded by the caps above rather than the length of the history. It is cached in Redis because logs are
+    written by the API workers while prompts are built by the ML service. Each entry stores the versions it
+    was built from: the user's counter (bumped on every log write), the global counter and the catalogue
+    version (exercise/tag renames and deletes). It is also rebuilt once a day since the load figures are
+    relative to today. Without Redis every read builds the summary from the database.
+    """
+    def __init__(self, token_budget: int, ttl_seconds: int):
+        self.token_budget = token_budget
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.builds = 0
+        self.invalidations = 0
+        self.build_time_s = 0.0
+
+    async def get(self, uid: UUID, session: AsyncSession) -> dict:
+        today = date.today()
+        try:
+            cached, *versions = await redis_client.mget(
+                _user_key(uid), USER_CONTEXT_VERSION_KEY, _user_version_key(uid), CATALOGUE_VERSION_KEY)
+        except redis.RedisError as e:
+            logging.warning(f"User context cache unavailable, building from the database: {e}")
+            return await self._build(uid, today, session)
+
+        # Versions are read before building, so a write racing the build bumps them past this entry
+        versions = [int(version) if version else 0 for version in versions]
+        if cached:
+            entry = json.loads(cached)
+            if entry["versions"] == versions and entry["summary"]["as_of"] == today.isoformat():
+                self.hits += 1
+                return entry["summary"]
+
+        summary = await self._build(uid, today, session)
+        try:
+            await redis_client.set(_user_key(uid), dump_context({"versions": versions, "summary": summary}),
+                                   ex=self.ttl_seconds)
+        except redis.RedisError as e:
+            logging.warning(f"User context not cached: {e}")
+
+        return summary
+
+    async def _build(self, uid: UUID, today: date, session: AsyncSession) -> dict:
+        start = perf_counter()
+        days, volume = await analytics_service.get_daily_volume(uid, session)
+        summary = {
+            "as_of": today.isoformat(),
+            "training_load": training_summary(days, volume, today),
+            "recent_top_sets": await self._recent_top_sets(uid, today, session),
+            "personal_records": await self._personal_records(uid, session),
+            "weekly_volume_by_tag": await self._weekly_volume_by_tag(uid, today, session),
+        }
+        summary = fit_to_budget(summary, self.token_budget)
+
+        self.builds += 1
+        self.build_time_s += perf_counter() - start
+        return summary
+
+    @staticmethod
+    async def _recent_top_sets(uid: UUID, today: date, session: AsyncSession) -> list[dict]:
+        # Latest training days, biggest exercises of each day first
+        statement = select(WorkoutDailyRollup.day,
+                           Exercise.exercise_name,
+                           WorkoutDailyRollup.total_sets,
+                           WorkoutDailyRollup.max_weight,
+                           WorkoutDailyRollup.max_weight_reps)\
+            .join(Exercise, Exercise.eid == WorkoutDailyRollup.exercise_eid)\
+            .where(WorkoutDailyRollup.user_uid == uid, WorkoutDailyRollup.day <= today)\
+            .order_by(WorkoutDailyRollup.day.desc(), WorkoutDailyRollup.total_volume.desc())\
+            .limit(MAX_RECENT_TOP_SETS)
+        result = await session.execute(statement)
+
+        return [{"day": row.day.isoformat(), "exercise": row.exercise_name, "sets": row.total_sets,
+                 "top_weight": row.max_weight, "top_reps": row.max_weight_reps} for row in result]
+
+    @staticmethod
+    async def _personal_records(uid: UUID, session: AsyncSession) -> list[dict]:
+        # Most recently set records first
+        last_set = func.greatest(PersonalRecord.max_weight_date, PersonalRecord.best_e1rm_date)
+        statement = select(Exercise.exercise_name,
+                           PersonalRecord.max_weight,
+                           PersonalRecord.max_weight_reps,
+                           PersonalRecord.max_weight_date,
+                           PersonalRecord.best_e1rm,
+                           PersonalRecord.best_e1rm_date)\
+            .join(Exercise, Exercise.eid == PersonalRecord.exercise_eid)\
+            .where(PersonalRecord.user_uid == uid, PersonalRecord.max_weight_wid.is_not(None))\
+            .order_by(last_set.desc().nulls_last(), Exercise.exercise_name)\
+            .limit(MAX_PERSONAL_RECORDS)
+        result = await session.execute(statement)
+
+        return [{"exercise": row.exercise_name,
+                 "max_weight": row.max_weight,
+                 "max_weight_reps": row.max_weight_reps,
+                 "max_weight_date": row.max_weight_date.isoformat(),
+                 "best_e1rm": round(row.best_e1rm, 1) if row.best_e1rm else None,
+                 "best_e1rm_date": row.best_e1rm_date.isoformat() if row.best_e1rm_date else None} for row in result]
+
+    @staticmethod
+    async def _weekly_volume_by_tag(uid: UUID, today: date, session: AsyncSession) -> dict:
+        """ Volume of the last TREND_WEEKS weeks (oldest first, 0 for weeks off) of the highest volume tags """
+        first_week = today - timedelta(days=today.weekday(), weeks=TREND_WEEKS - 1)
+        week = cast(func.date_trunc("week", WorkoutDailyRollup.day), Date)
+        statement = select(Tag.tag_name, week.label("week"), func.sum(WorkoutDailyRollup.total_volume).label("volume"))\
+            .join(exercise_tags, exercise_tags.c.eid == WorkoutDailyRollup.exercise_eid)\
+            .join(Tag, Tag.tid == exercise_tags.c.tid)\
+            .where(WorkoutDailyRollup.user_uid == uid, WorkoutDailyRollup.day.between(first_week, today))\
+            .group_by(Tag.tag_name, week)
+        result = await session.execute(statement)
+
+        trend: dict[str, list[int]] = {}
+        for row in result:
+            weekly = trend.setdefault(row.tag_name, [0] * TREND_WEEKS)
+            weekly[(row.week - first_week).days // 7] = round(row.volume)
+        top_tags = sorted(trend, key=lambda tag: (-sum(trend[tag]), tag))[:MAX_TREND_TAGS]
+
+        return {"first_week": first_week.isoformat(), "tags": {tag: trend[tag] for tag in top_tags}}
+
+    async def invalidate(self, uid: UUID | None = None) -> None:
+        """ Call after committing log writes of a user, or of any number of users with uid=None """
+        self.invalidations += 1
+        try:
+            await redis_client.incr(_user_version_key(uid) if uid else USER_CONTEXT_VERSION_KEY)
+        except redis.RedisError as e:
+            logging.warning(f"User context version not bumped, prompts may use a stale summary: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "token_budget": self.token_budget,
+            "hits": self.hits,
+            "builds": self.builds,
+            "invalidations": self.invalidations,
+            "avg_build_ms": round(self.build_time_s / self.builds * 1000, 3) if self.builds else 0.0,
+        }
+
+
+user_context_cache = UserContextCache(token_budget=Config.USER_CONTEXT_TOKEN_BUDGET,
+                                      ttl_seconds=Config.USER_CONTEXT_TTL_SECONDS)
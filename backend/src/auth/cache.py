@@ -0,0 +1,135 @@
+# Per-process cache of verified auth principals (decoded JWT payload + resolved user) keyed by JWT ID (JTI)
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic, time
+from uuid import UUID
+from src.auth.schemas import UserBase
+from src.config import Config
+
+
+@dataclass
+class PrincipalEntry:
+    payload: dict
+    user: UserBase | None
+    expires_at: float # monotonic clock
+
+
+class PrincipalCache:
+    """
+    Bounded (LRU + TTL) cache of principals so a guarded request does not repeat the blocklist check
+    and user lookup for a token that was already verified by this process.
+    Entries must be invalidated when the token is revoked or the user is updated/deleted.
+    """
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: OrderedDict[str, PrincipalEntry] = OrderedDict()
+        self._jtis_by_uid: dict[str, set[str]] = {}
+
+        self.payload_hits = 0
+        self.payload_misses = 0
+        self.user_hits = 0
+        self.user_misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _get_entry(self, jti: str) -> PrincipalEntry | None:
+        entry = self._entries.get(jti)
+        if not entry:
+            return None
+        if entry.expires_at <= monotonic():
+            self._remove(jti)
+            return None
+
+        self._entries.move_to_end(jti)
+        return entry
+
+    def get_payload(self, jti: str) -> dict | None:
+        entry = self._get_entry(jti)
+        if not entry:
+            self.payload_misses += 1
+            return None
+
+        self.payload_hits += 1
+        return entry.payload
+
+    def get_user(self, jti: str) -> UserBase | None:
+        entry = self._get_entry(jti)
+        if not entry or not entry.user:
+            self.user_misses += 1
+            return None
+
+        self.user_hits += 1
+        return entry.user
+
+    def put_payload(self, jti: str, payload: dict) -> None:
+        if self.max_size <= 0:
+            return
+
+        # Never outlive the token itself
+        ttl = min(self.ttl_seconds, payload.get("exp", float("inf")) - time())
+        if ttl <= 0:
+            return
+
+        entry = self._entries.get(jti)
+        if entry:
+            entry.payload = payload
+            self._entries.move_to_end(jti)
+        else:
+            self._entries[jti] = PrincipalEntry(payload=payload, user=None, expires_at=monotonic() + ttl)
+            self._jtis_by_uid.setdefault(str(payload["user"]["uid"]), set()).add(jti)
+
+        while len(self._entries) > self.max_size:
+            oldest_jti = next(iter(self._entries))
+            self._remove(oldest_jti)
+            self.evictions += 1
+
+    def put_user(self, jti: str, user: UserBase) -> None:
+        entry = self._entries.get(jti)
+        if entry:
+            entry.user = user
+
+    def invalidate_jti(self, jti: str) -> None:
+        if jti in self._entries:
+            self._remove(jti)
+            self.invalidations += 1
+
+    def invalidate_user(self, uid: UUID | str) -> None:
+        for jti in list(self._jtis_by_uid.get(str(uid), ())):
+            self.invalidate_jti(jti)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._jtis_by_uid.clear()
+
+    def _remove(self, jti: str) -> None:
+        entry = self._entries.pop(jti, None)
+        if not entry:
+            return
+
+        uid = str(entry.payload["user"]["uid"])
+        jtis = self._jtis_by_uid.get(uid)
+        if jtis:
+            jtis.discard(jti)
+            if not jtis:
+                self._jtis_by_uid.pop(uid)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "payload_hits": self.payload_hits,
+            "payload_misses": self.payload_misses,
+            "user_hits": self.user_hits,
+            "user_misses": self.user_misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=Config.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=Config.PRINCIPAL_CACHE_TTL_SECONDS
+)
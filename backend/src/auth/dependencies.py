@@ -8,11 +8,26 @@ from src.auth.utils import decode_validate_jwt
 from src.auth.schemas import UserBase
 from src.db.redis_cache import token_in_blocklist
 from src.auth.service import UserService
+from src.auth.cache import principal_cache
+from dataclasses import dataclass
 from typing import List
 
 
 user_service = UserService()
 
+@dataclass
+class RequestAuthContext:
+    """ Verified token state shared by every auth dependency within a single request """
+    token: str | None = None
+    payload: dict | None = None
+
+def get_request_auth_context(request: Request) -> RequestAuthContext:
+    auth_context = getattr(request.state, "auth_context", None)
+    if not auth_context:
+        auth_context = RequestAuthContext()
+        request.state.auth_context = auth_context
+    return auth_context
+
 class TokenBearer(HTTPBearer):
     def __init__(self, auto_error=True):
         super().__init__(auto_error=auto_error)
@@ -23,6 +38,20 @@ class TokenBearer(HTTPBearer):
 
         token = creds.credentials
 
+        # Token was already verified by another auth dependency of this request
+        auth_context = get_request_auth_context(request)
+        if auth_context.token == token:
+            self.verify_payload(auth_context.payload)
+            return auth_context.payload
+
+        payload = await self.verify_token(token)
+        auth_context.token, auth_context.payload = token, payload
+
+        self.verify_payload(payload)
+
+        return payload
+
+    async def verify_token(self, token: str) -> dict:
         payload = decode_validate_jwt(token)
 
         if not payload:
@@ -30,13 +59,15 @@ class TokenBearer(HTTPBearer):
                 "error": "Invalid or expired token.",
                 "resolution": "Please get a new token."
             })
-        elif await token_in_blocklist(payload["jti"]):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={
-                "error": "Token is revoked.",
-                "resolution": "Please get a new token."
-            })
-        
-        self.verify_payload(payload)
+        # Tokens already verified by this process skip the blocklist round-trip (entries are
+        # invalidated on revocation)
+        elif not principal_cache.get_payload(payload["jti"]):
+            if await token_in_blocklist(payload["jti"]):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={
+                    "error": "Token is revoked.",
+                    "resolution": "Please get a new token."
+                })
+            principal_cache.put_payload(payload["jti"], payload)
 
         return payload
     
@@ -55,15 +86,26 @@ class RefreshTokenBearer(TokenBearer):
         if not payload["refresh"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="Please provide refresh token.")
-        
+
+# Shared instances, FastAPI only de-duplicates a dependency within a request if it is the same callable
+access_token_bearer = AccessTokenBearer()
+refresh_token_bearer = RefreshTokenBearer()
+
 async def get_current_user(
-        payload: dict = Depends(AccessTokenBearer()),
+        payload: dict = Depends(access_token_bearer),
         session: AsyncSession = Depends(get_session)
 ) -> UserBase:
+    cached_user = principal_cache.get_user(payload["jti"])
+    if cached_user:
+        return cached_user
+
     user_email = payload["user"]["email"]
-    user = await user_service.get_user_by_email(user_email, session)
+    user = await user_service.get_principal_by_email(user_email, session)
+
+    current_user = UserBase.model_validate(user)
+    principal_cache.put_user(payload["jti"], current_user)
 
-    return UserBase.model_validate(user)
+    return current_user
 
 class RoleChecker:
     def __init__(self, allowed_roles: List[str]):
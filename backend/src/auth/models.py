@@ -36,8 +36,11 @@ class User(BaseModel):
 
     role = Column(VARCHAR, nullable=False, server_default="user")
 
-    logs = relationship("WorkoutLog", back_populates="user", lazy="selectin")
-    search_results = relationship("ResearchResult", back_populates="user", lazy="selectin")
+    # Never loaded implicitly: a User is resolved on almost every authenticated request, so
+    # collections must be requested explicitly with selectinload() where they are actually used.
+    # Both are deleted with their user by ON DELETE CASCADE, so deleting a User never loads them
+    logs = relationship("WorkoutLog", back_populates="user", lazy="raise", passive_deletes=True)
+    search_results = relationship("ResearchResult", back_populates="user", lazy="raise", passive_deletes=True)
 
     def __repr__(self) -> str:
         return f"User {self.username}"
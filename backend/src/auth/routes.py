@@ -7,10 +7,10 @@ from src.auth.service import UserService
 from src.auth.utils import decode_validate_jwt
 from src.db.db import get_session
 from src.db.redis_cache import add_temp_login_response, delete_temp_login_response, get_temp_login_response, delete_temp_login_response
-from src.auth.utils import verify_pwd, generate_jwt, revoke_access_refresh
+from src.auth.utils import verify_pwd_async, generate_jwt, revoke_access_refresh
 from datetime import datetime, timedelta
 from src.config import Config
-from src.auth.dependencies import AccessTokenBearer, RefreshTokenBearer, get_current_user, RoleChecker
+from src.auth.dependencies import access_token_bearer, refresh_token_bearer, get_current_user, RoleChecker
 from uuid import UUID, uuid4
 from authlib.integrations.starlette_client import OAuth
 import secrets
@@ -31,7 +31,7 @@ user_service = UserService()
 @auth_router.patch("/update", response_model=UserBase, status_code=status.HTTP_200_OK)
 async def update_user(
     user_update_data: UserUpdate,  
-    payload: dict = Depends(AccessTokenBearer()), 
+    payload: dict = Depends(access_token_bearer), 
     session: AsyncSession = Depends(get_session)
     ):
     updated_user = await user_service.update_user(UUID(payload["user"]["uid"]), user_update_data, session)
@@ -57,7 +57,7 @@ async def login_user(login_data: UserLogin, session: AsyncSession = Depends(get_
     user = await user_service.get_user_by_email(login_data.email, session)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No account under this email.")
-    elif not verify_pwd(login_data.password, user.password_hash):
+    elif not await verify_pwd_async(login_data.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Incorrect password")
     
     # Generate JWT
@@ -76,7 +76,7 @@ async def login_user(login_data: UserLogin, session: AsyncSession = Depends(get_
 
 
 @auth_router.get("/refresh_token")
-async def get_new_access_token(payload: dict = Depends(RefreshTokenBearer())):
+async def get_new_access_token(payload: dict = Depends(refresh_token_bearer)):
     # I've found that this is redundant, exp is checked in the Depends() at jwt decoding
     # if datetime.now() > datetime.fromtimestamp(payload["exp"]):
     #     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expired token.")
@@ -87,7 +87,7 @@ async def get_new_access_token(payload: dict = Depends(RefreshTokenBearer())):
 
 # Revokes both access token (auth header) and refresh token (request body)
 @auth_router.post("/logout")
-async def logout_user(logout_data: UserLogout, payload: dict = Depends(AccessTokenBearer())):
+async def logout_user(logout_data: UserLogout, payload: dict = Depends(access_token_bearer)):
     _ = await revoke_access_refresh(access_token_payload = payload, 
                                     refresh_token = logout_data.refresh_token)
                                     
@@ -104,7 +104,7 @@ async def get_user(user: UserBase = Depends(get_current_user),
 @auth_router.delete("/delete/{refresh_token}")
 async def remove_user(
     refresh_token: str, 
-    payload: dict = Depends(AccessTokenBearer()),
+    payload: dict = Depends(access_token_bearer),
     session: AsyncSession = Depends(get_session)
     ):
     _ = await revoke_access_refresh(access_payload = payload, 
@@ -1,14 +1,32 @@
 from src.auth.models import User
 from sqlalchemy import select, delete
+from sqlalchemy.orm import load_only, raiseload
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.schemas import UserCreate, UserUpdate
-from src.auth.utils import generate_pwd_hash
+from src.auth.utils import generate_pwd_hash_async
+from src.db.redis_cache import invalidate_user_principals
 from uuid import UUID
 from fastapi.exceptions import HTTPException
 from fastapi import status
 
 
+# Columns required to build the auth principal (UserBase), relationships are never loaded
+PRINCIPAL_COLUMNS = (
+    User.uid, User.username, User.first_name, User.last_name, User.is_verified, User.email,
+    User.password_hash, User.role, User.created_at, User.birth_month, User.birth_year,
+    User.height_raw, User.height_unit,
+)
+
 class UserService:
+    async def get_principal_by_email(self, email: str, session: AsyncSession):
+        """ Lean user lookup used by the auth dependencies on every guarded request """
+        statement = select(User)\
+            .options(load_only(*PRINCIPAL_COLUMNS), raiseload("*"))\
+            .where(User.email == email)
+        result = await session.execute(statement)
+
+        return result.scalar_one_or_none()
+
     async def get_user_by_email(self, email: str, session: AsyncSession):
         statement = select(User).where(User.email == email)
         result = await session.execute(statement)
@@ -24,7 +42,7 @@ class UserService:
     async def create_user(self, user_data: UserCreate, session: AsyncSession):
         user_dict = user_data.model_dump()
         new_user = User(**user_dict)
-        new_user.password_hash = generate_pwd_hash(user_data.password)
+        new_user.password_hash = await generate_pwd_hash_async(user_data.password)
 
         session.add(new_user)
         await session.commit()
@@ -35,17 +53,15 @@ class UserService:
 
 
     async def delete_user(self, uid: UUID, session: AsyncSession):
-        user = await self.get_user_by_id(uid, session)
-        if not user:
+        # Workout logs, personal records and research results go with the user through ON DELETE CASCADE
+        statement = delete(User).where(User.uid == uid).returning(User.uid)
+        result = await session.execute(statement)
+        if result.scalar_one_or_none() is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                 detail="User for deletion not found.")
 
-        # Remove associated workout logs (FKEY constraint)
-        from src.workout_logs.service import WorkoutLogService
-        _ = await WorkoutLogService.delete_log_by_user_id(user.uid, session)
-
-        await session.delete(user)
         await session.commit()
+        await invalidate_user_principals(uid)
 
         return
     
@@ -62,5 +78,6 @@ class UserService:
         
         await session.commit()
         await session.refresh(user)
+        await invalidate_user_principals(uid)
 
         return user
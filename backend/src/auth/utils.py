@@ -1,12 +1,72 @@
 import jwt
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import status
+from fastapi.exceptions import HTTPException
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from src.config import Config
 import uuid
 from src.db.redis_cache import add_jti_to_blocklist
 
-pwd_context = CryptContext(schemes=["bcrypt"])
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=Config.BCRYPT_ROUNDS)
+
+
+class PasswordHashPool:
+    """
+    Bounded thread pool for bcrypt, which would otherwise block the event loop for 100-300ms per call.
+    Jobs beyond max_queue waiting jobs are rejected (503) instead of piling up during login spikes.
+    """
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pwd_hash")
+
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.queue_depth >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                    detail="Too many concurrent authentication requests, please retry.")
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        def job():
+            with self._lock:
+                self.queue_depth -= 1
+                self.active += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, job)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "active": self.active,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "bcrypt_rounds": Config.BCRYPT_ROUNDS,
+        }
+
+pwd_hash_pool = PasswordHashPool(max_workers=Config.PWD_HASH_WORKERS, max_queue=Config.PWD_HASH_MAX_QUEUE)
+
 
 def generate_pwd_hash(pwd: str) -> str:
     return  pwd_context.hash(pwd)
@@ -16,6 +76,15 @@ def verify_pwd(pwd: str, hash: str) -> bool:
     return pwd_context.verify(pwd, hash)
 
 
+# Async handlers must use these, never the blocking versions above
+async def generate_pwd_hash_async(pwd: str) -> str:
+    return await pwd_hash_pool.run(generate_pwd_hash, pwd)
+
+
+async def verify_pwd_async(pwd: str, hash: str) -> bool:
+    return await pwd_hash_pool.run(verify_pwd, pwd, hash)
+
+
 def generate_jwt(user_data: dict, expiry: timedelta = timedelta(minutes=60), refresh: bool = False) -> str:
     payload = {
         "user": user_data,
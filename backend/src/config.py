@@ -5,13 +5,51 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.dirname(current_dir)
 
 class Settings(BaseSettings):
+    # "development" or "production" (production turns SQL echo off unless DB_ECHO is set)
+    ENVIRONMENT: str = "development"
     DATABASE_URL: str
+    DB_ECHO: bool | None = None
+    # Async engine connection pool, per API worker
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Prepared statement cache entries per connection, for both SQLAlchemy and asyncpg
+    # (0 disables both and names statements uniquely, needed behind pgbouncer transaction pooling)
+    DB_STATEMENT_CACHE_SIZE: int = 100
     JWT_SECRET: str
     JWT_ALGORITHM: str
     # Short-lived access JWT (minutes). Typical for APIs: 15–30m.
     ACCESS_TOKEN_EXPIRY_MINUTES: int = 30
     # Long-lived refresh JWT (days). Typical consumer apps: 7–30d.
     REFRESH_TOKEN_EXPIRY: int = 14
+    # Per-process cache of verified principals (by JWT ID). The TTL bounds how long another worker
+    # may keep accepting a token revoked elsewhere, so keep it short.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    # bcrypt work factor (2^rounds iterations), lower it (min 4) only for load tests/CI
+    BCRYPT_ROUNDS: int = 12
+    # Dedicated password hashing threads, and how many hash jobs may wait for one before shedding load
+    PWD_HASH_WORKERS: int = 4
+    PWD_HASH_MAX_QUEUE: int = 64
+    # How often each worker re-reads the exercise/tag catalogue version from Redis, which bounds how
+    # long it may serve a catalogue changed by another worker
+    CATALOGUE_VERSION_CHECK_SECONDS: float = 1.0
+    # Size cap (estimated tokens) of the training history summary added to LLM prompts, and how long an
+    # unused summary stays cached in Redis
+    USER_CONTEXT_TOKEN_BUDGET: int = 800
+    USER_CONTEXT_TTL_SECONDS: int = 86400
+    # ML service threads for blocking retrieval calls, kept off the event loop: query embedding + Chroma
+    # search (bounded by the embedding model's device) and Exa HTTP requests (I/O bound)
+    RAG_VECTOR_WORKERS: int = 2
+    RAG_SEARCH_WORKERS: int = 8
+    # Retrieval deadlines from the start of retrieval (the vector one covers embedding and collection queries),
+    # a leg that misses its deadline contributes no results instead of failing the request
+    RAG_VECTOR_TIMEOUT_SECONDS: float = 15.0
+    RAG_SEARCH_TIMEOUT_SECONDS: float = 20.0
+    # Query embeddings cached per ML worker, and shared between workers through Redis for the TTL (0 disables)
+    RAG_QUERY_EMBEDDING_CACHE_SIZE: int = 4096
+    RAG_QUERY_EMBEDDING_REDIS_TTL_SECONDS: int = 7 * 24 * 3600
     REDIS_URL: str
     REDIS_HOST: str
     REDIS_PORT: str
@@ -20,6 +58,16 @@ class Settings(BaseSettings):
     EXA_API_KEY: str
     YT_API_KEY: str
     HF_EMBED_MODEL_NAME: str
+    # Embedding model device ("auto": CUDA, then MPS, then CPU). On CPU the model runs on ONNX Runtime
+    # (dynamically int8 quantized) or OpenVINO, or "torch"; EMBED_CPU_THREADS=0 keeps the library default
+    EMBED_DEVICE: str = "auto"
+    EMBED_CPU_BACKEND: str = "onnx"
+    EMBED_CPU_QUANTIZE: bool = True
+    EMBED_CPU_THREADS: int = 0
+    # Texts per forward pass, 0 sizes batches from free memory and text length
+    EMBED_BATCH_SIZE: int = 0
+    # Exported/quantized CPU models are saved here once
+    EMBED_EXPORT_PATH: str = "data/embed_models"
     CHROMA_VDB_PATH: str
     TRANSCRIPT_PATH: str
     ML_SERVICE_ENDPOINT: str
@@ -39,5 +87,8 @@ Config = Settings()
 if not os.path.isabs(Config.CHROMA_VDB_PATH):
     Config.CHROMA_VDB_PATH = os.path.join(root_dir, Config.CHROMA_VDB_PATH)
 
+if not os.path.isabs(Config.EMBED_EXPORT_PATH):
+    Config.EMBED_EXPORT_PATH = os.path.join(root_dir, Config.EMBED_EXPORT_PATH)
+
 if not os.path.isabs(Config.TRANSCRIPT_PATH):
     Config.TRANSCRIPT_PATH = os.path.join(root_dir, Config.TRANSCRIPT_PATH)
\ No newline at end of file
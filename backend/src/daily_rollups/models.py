@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Date, Float, Integer, ForeignKey
+from sqlalchemy.schema import Index
+from sqlalchemy.dialects.postgresql import UUID
+from src.db.base_model import BaseModel
+
+
+class WorkoutDailyRollup(BaseModel):
+    """
+    Per user, exercise and day totals of workout_logs, kept current by WorkoutLogService writes and
+    rebuilt by `python -m src.daily_rollups.refresh`. Dashboards read this instead of raw sets.
+    """
+    __tablename__ = "workout_daily_rollup"
+
+    __table_args__ = (
+        # A user's days across all exercises (weekly charts, training load)
+        Index("ix_workout_daily_rollup_user_day", "user_uid", "day"),
+        # Rollups of an exercise across users (ON DELETE CASCADE from exercises)
+        Index("ix_workout_daily_rollup_exercise_eid", "exercise_eid"),
+    )
+
+    user_uid = Column(UUID(as_uuid=True), ForeignKey("user_accounts.uid", ondelete="CASCADE"), primary_key=True)
+    exercise_eid = Column(UUID(as_uuid=True), ForeignKey("exercises.eid", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date(), primary_key=True)
+
+    total_sets = Column(Integer, nullable=False)
+    total_reps = Column(Float, nullable=False)
+    total_volume = Column(Float, nullable=False) # sum of reps x weight
+    max_weight = Column(Float, nullable=False)
+    # Reps of the day's top set (heaviest, then most reps)
+    max_weight_reps = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"WorkoutDailyRollup {self.user_uid} {self.exercise_eid} {self.day}"
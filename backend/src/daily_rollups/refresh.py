@@ -0,0 +1,27 @@
+"""
+Rebuilds workout_daily_rollup from workout_logs, e.g. after logs were changed outside the API. Run from backend/:
+
+    python -m src.daily_rollups.refresh [--user-uid UID]
+"""
+import argparse
+import asyncio
+from uuid import UUID
+
+from src.db.db import get_session_context
+from src.daily_rollups.service import DailyRollupService
+from src.analytics.user_context import user_context_cache
+
+
+async def main(uid: UUID | None):
+    async with get_session_context() as session:
+        n_rows = await DailyRollupService().rebuild(session, uid)
+        await session.commit()
+    # Cached prompt summaries are built from the rollup
+    await user_context_cache.invalidate(uid)
+    print(f"Rebuilt {n_rows} workout_daily_rollup rows" + (f" for user {uid}" if uid else ""))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--user-uid", type=UUID, default=None, help="Only rebuild this user's rows")
+    args = parser.parse_args()
+    asyncio.run(main(args.user_uid))
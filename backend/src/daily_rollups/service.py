@@ -0,0 +1,72 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, text, tuple_, bindparam, String
+from sqlalchemy.dialects.postgresql import insert, array_agg, aggregate_order_by, ARRAY
+from src.daily_rollups.models import WorkoutDailyRollup
+from src.workout_logs.models import WorkoutLog
+from datetime import date
+from typing import Iterable
+from uuid import UUID
+
+ROLLUP_COLUMNS = ("user_uid", "exercise_eid", "day", "total_sets", "total_reps", "total_volume",
+                  "max_weight", "max_weight_reps")
+
+# Serializes recomputation of the same (user, exercise, day) across transactions, in a fixed order
+LOCK_KEYS_SQL = text(
+    "SELECT pg_advisory_xact_lock(hashtextextended(k, 0)) FROM unnest(CAST(:keys AS text[])) AS k ORDER BY k"
+).bindparams(bindparam("keys", type_=ARRAY(String)))
+
+
+class DailyRollupService:
+    """
+    Keeps workout_daily_rollup current. A write recomputes only the (user, exercise, day) rows it touched
+    from the logs of that day, so the cost does not depend on history length.
+    """
+    @staticmethod
+    def _aggregate(*filters):
+        return select(WorkoutLog.user_uid,
+                      WorkoutLog.exercise_eid,
+                      WorkoutLog.date_performed,
+                      func.count(),
+                      func.sum(WorkoutLog.reps),
+                      func.sum(WorkoutLog.reps * WorkoutLog.weight),
+                      func.max(WorkoutLog.weight),
+                      array_agg(aggregate_order_by(WorkoutLog.reps,
+                                                   WorkoutLog.weight.desc(), WorkoutLog.reps.desc()))[1])\
+            .where(*filters)\
+            .group_by(WorkoutLog.user_uid, WorkoutLog.exercise_eid, WorkoutLog.date_performed)
+
+    async def refresh_days(self, keys: Iterable[tuple[UUID, UUID, date]], session: AsyncSession) -> None:
+        """ Recomputes the rollup rows of the given (user_uid, exercise_eid, day) keys, call after flushing logs """
+        keys = sorted(set(keys))
+        if not keys:
+            return
+
+        await session.execute(LOCK_KEYS_SQL, {"keys": [f"{uid}:{eid}:{day}" for uid, eid, day in keys]})
+        await session.execute(
+            delete(WorkoutDailyRollup)
+            .where(tuple_(WorkoutDailyRollup.user_uid, WorkoutDailyRollup.exercise_eid, WorkoutDailyRollup.day)
+                   .in_(keys))
+            .execution_options(synchronize_session=False))
+        await session.execute(insert(WorkoutDailyRollup).from_select(ROLLUP_COLUMNS, self._aggregate(
+            tuple_(WorkoutLog.user_uid, WorkoutLog.exercise_eid, WorkoutLog.date_performed).in_(keys))))
+
+    @staticmethod
+    async def delete_rollups_by_user_id(uid: UUID, session: AsyncSession) -> None:
+        await session.execute(delete(WorkoutDailyRollup).where(WorkoutDailyRollup.user_uid == uid)
+                              .execution_options(synchronize_session=False))
+
+    async def rebuild(self, session: AsyncSession, uid: UUID | None = None) -> int:
+        """
+        Repairs the rollup from workout_logs, for one user or everyone. Concurrent log writes wait for it.
+        Returns the number of rollup rows written.
+        """
+        await session.execute(text("LOCK TABLE workout_daily_rollup IN EXCLUSIVE MODE"))
+        if uid:
+            await self.delete_rollups_by_user_id(uid, session)
+            aggregate = self._aggregate(WorkoutLog.user_uid == uid)
+        else:
+            await session.execute(delete(WorkoutDailyRollup).execution_options(synchronize_session=False))
+            aggregate = self._aggregate()
+        result = await session.execute(insert(WorkoutDailyRollup).from_select(ROLLUP_COLUMNS, aggregate))
+
+        return result.rowcount
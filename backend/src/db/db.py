@@ -1,15 +1,64 @@
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from typing import AsyncGenerator
 from contextlib import asynccontextmanager
+from time import perf_counter
+from uuid import uuid4
 
 from src.config import Config
 from src.db.base_model import BaseModel
 
+
+class PoolMetrics:
+    """ Connection checkout counters for the async engine's pool (per process) """
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    def record_checkout(self, wait_s: float) -> None:
+        self.checkouts += 1
+        self.total_wait_s += wait_s
+        self.max_wait_s = max(self.max_wait_s, wait_s)
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """ Queue pool that records how long each checkout waited for a connection """
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        pool_metrics.record_checkout(perf_counter() - start)
+        return conn
+
+def _connect_args() -> dict:
+    # SQLAlchemy's adapter cache and asyncpg's own statement cache are sized together. With both at 0 and
+    # uniquely named statements no prepared statement outlives its transaction, which pgbouncer's
+    # transaction pooling needs since the next transaction may land on another server connection
+    args = {"prepared_statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE}
+    if Config.DB_STATEMENT_CACHE_SIZE == 0:
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return args
+
 async_engine = create_async_engine(
     url=Config.DATABASE_URL,
-    echo=True,
-    pool_pre_ping=True
+    # Echo logs every statement synchronously, never default it on in production
+    echo=Config.DB_ECHO if Config.DB_ECHO is not None else Config.ENVIRONMENT != "production",
+    pool_pre_ping=True,
+    poolclass=InstrumentedQueuePool,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_timeout=Config.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=Config.DB_POOL_RECYCLE_SECONDS,
+    connect_args=_connect_args()
 )
 Session = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -24,4 +73,18 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 @asynccontextmanager
 async def get_session_context() -> AsyncGenerator[AsyncSession, None]:
     async with Session() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def get_pool_stats() -> dict:
+    pool = async_engine.pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": pool_metrics.checkouts,
+        "checkout_timeouts": pool_metrics.timeouts,
+        "avg_checkout_wait_ms": round(pool_metrics.total_wait_s / pool_metrics.checkouts * 1000, 3) if pool_metrics.checkouts else 0.0,
+        "max_checkout_wait_ms": round(pool_metrics.max_wait_s * 1000, 3),
+    }
@@ -1,6 +1,15 @@
 # Redis (caching layer) for JWT blocklist (to invalidate tokens) by JWT ID (JTI)
+import asyncio
+import heapq
+import logging
+from time import time
 import redis.asyncio as redis
 from src.config import Config
+from src.auth.cache import principal_cache
+
+BLOCKLIST_CHANNEL = "blocklist:revoked"
+# Users whose cached principals are stale (role/profile updated, account deleted)
+USER_INVALIDATION_CHANNEL = "principal:user_changed"
 
 # Keep revoked tokens blocked at least as long as the longest JWT we issue (refresh).
 def _jti_blocklist_ttl_seconds() -> int:
@@ -14,12 +23,146 @@ redis_client = redis.Redis(
 
 # token_blocklist = redis.from_url(Config.REDIS_URL)
 
+class BlocklistMirror:
+    """
+    Process-local copy of the revoked JTIs so the common "not revoked" check needs no Redis round-trip.
+    Loaded with SCAN and then kept current through the BLOCKLIST_CHANNEL pub/sub channel (subscribed before
+    the snapshot so no revocation falls in between). While the subscription is down, checks fall back to Redis.
+    The same subscription carries USER_INVALIDATION_CHANNEL, dropping this process's cached principals of a
+    user changed by another worker. Invalidations missed while unsubscribed are covered by clearing the
+    principal cache whenever the subscription is (re)established.
+    Expired JTIs are evicted in expiry order on every add(), so the mirror stays bounded by the tokens
+    revoked within one blocklist TTL.
+    """
+    def __init__(self, retry_delay_seconds: float = 1.0):
+        self.retry_delay_seconds = retry_delay_seconds
+        self.synced = False
+
+        self._revoked: dict[str, float] = {} # jti -> expiry (epoch seconds)
+        self._expiries: list[tuple[float, str]] = [] # min-heap of (expiry, jti)
+        self._synced_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        self.local_checks = 0
+        self.remote_checks = 0
+        self.revocations_received = 0
+        self.user_invalidations_received = 0
+
+    async def start(self, timeout_seconds: float = 5.0) -> None:
+        if self._task:
+            return
+        self._synced_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._synced_event.wait(), timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            logging.warning("Blocklist mirror not synced yet, falling back to Redis lookups.")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.synced = False
+
+    def add(self, jti: str, expires_at: float | None = None) -> None:
+        expires_at = expires_at or time() + _jti_blocklist_ttl_seconds()
+        self._revoked[jti] = expires_at
+        heapq.heappush(self._expiries, (expires_at, jti))
+        principal_cache.invalidate_jti(jti)
+        self._evict_expired()
+
+    def _evict_expired(self) -> None:
+        now = time()
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._expiries)
+            # A JTI revoked again since has a later entry in the heap
+            if self._revoked.get(jti) == expires_at:
+                del self._revoked[jti]
+
+    def contains(self, jti: str) -> bool:
+        self.local_checks += 1
+        expires_at = self._revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time():
+            self._revoked.pop(jti)
+            return False
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with redis_client.pubsub() as pubsub:
+                    await pubsub.subscribe(BLOCKLIST_CHANNEL, USER_INVALIDATION_CHANNEL)
+                    await self._load_snapshot()
+                    principal_cache.clear()
+                    self.synced = True
+                    self._synced_event.set()
+
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        if message["channel"].decode() == USER_INVALIDATION_CHANNEL:
+                            principal_cache.invalidate_user(message["data"].decode())
+                            self.user_invalidations_received += 1
+                        else:
+                            self.add(message["data"].decode())
+                            self.revocations_received += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.exception(e)
+            finally:
+                self.synced = False
+            await asyncio.sleep(self.retry_delay_seconds)
+
+    async def _load_snapshot(self) -> None:
+        revoked = {}
+        now = time()
+        async for key in redis_client.scan_iter(match="blocklist:*", count=1000):
+            jti = key.decode().split(":", 1)[1]
+            revoked[jti] = now + _jti_blocklist_ttl_seconds()
+        self._revoked = revoked
+        self._expiries = [(expires_at, jti) for jti, expires_at in revoked.items()]
+        heapq.heapify(self._expiries)
+
+    def stats(self) -> dict:
+        return {
+            "synced": self.synced,
+            "size": len(self._revoked),
+            "local_checks": self.local_checks,
+            "remote_checks": self.remote_checks,
+            "revocations_received": self.revocations_received,
+            "user_invalidations_received": self.user_invalidations_received,
+        }
+
+blocklist_mirror = BlocklistMirror()
+
 async def add_jti_to_blocklist(jti: str) -> None:
-    await redis_client.set(
-        name=f"blocklist:{jti}", value="", ex=_jti_blocklist_ttl_seconds()
-    )
+    # Single round-trip: persist the revocation and notify every worker's mirror
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.set(name=f"blocklist:{jti}", value="", ex=_jti_blocklist_ttl_seconds())
+        pipe.publish(BLOCKLIST_CHANNEL, jti)
+        await pipe.execute()
+    blocklist_mirror.add(jti)
+
+async def invalidate_user_principals(uid) -> None:
+    """ Call after committing a change to a user, drops their cached principals in every worker """
+    principal_cache.invalidate_user(uid)
+    try:
+        await redis_client.publish(USER_INVALIDATION_CHANNEL, str(uid))
+    except redis.RedisError as e:
+        logging.warning(f"User invalidation not published, other workers may serve a stale principal: {e}")
 
 async def token_in_blocklist(jti: str) -> bool:
+    if blocklist_mirror.synced:
+        return blocklist_mirror.contains(jti)
+
+    blocklist_mirror.remote_checks += 1
     return True if await redis_client.exists(f"blocklist:{jti}") else False
 
 async def cache_research_response(result_id: str, research_result_str: str):
@@ -0,0 +1,155 @@
+# Per-process cache of the exercise/tag catalogue, invalidated through a version counter in Redis
+import asyncio
+import logging
+from dataclasses import dataclass
+from time import monotonic, perf_counter
+from uuid import UUID
+import redis.asyncio as redis
+from sqlalchemy import select
+from src.exercise.models import Exercise
+from src.tags.models import Tag, exercise_tags
+from src.db.db import get_session_context
+from src.db.redis_cache import redis_client
+from src.config import Config
+
+CATALOGUE_VERSION_KEY = "catalogue:version"
+
+
+@dataclass(frozen=True)
+class CatalogueSnapshot:
+    """ Read-only view of the catalogue, shared between requests so callers must not mutate it """
+    version: int | None
+    exercises: list[dict] # exercise columns + "tags", ordered by slug descending (the get_all_exercises order)
+    eids_by_slug: dict[str, UUID]
+    tags: list[dict] # ordered by name descending (the get_all_tags order)
+    tags_by_tid: dict[UUID, dict]
+    tids_by_name: dict[str, UUID]
+    tids_by_eid: dict[UUID, list[UUID]]
+
+
+class CatalogueCache:
+    """
+    Exercises and tags change rarely but are read on almost every request (log writes resolve slugs,
+    exercise writes resolve tags). The whole catalogue is loaded in three queries and kept until the
+    Redis version counter moves, which every exercise/tag mutation bumps after committing. Snapshots are
+    loaded in their own session, never the caller's, so they only hold committed rows. Each worker
+    re-reads the counter at most every version_check_seconds, which bounds how long it may serve a
+    catalogue that another worker has changed. Without Redis every read goes to the database.
+    """
+    def __init__(self, version_check_seconds: float):
+        self.version_check_seconds = version_check_seconds
+
+        self._snapshot: CatalogueSnapshot | None = None
+        self._checked_at = 0.0 # monotonic clock
+        self._load_lock = asyncio.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.version_checks = 0
+        self.invalidations = 0
+        self.hit_time_s = 0.0
+        self.load_time_s = 0.0
+
+    async def _remote_version(self) -> int | None:
+        self.version_checks += 1
+        try:
+            version = await redis_client.get(CATALOGUE_VERSION_KEY)
+        except redis.RedisError as e:
+            logging.warning(f"Catalogue version unavailable, reading the catalogue from the database: {e}")
+            return None
+        return int(version) if version else 0
+
+    async def get(self) -> CatalogueSnapshot:
+        start = perf_counter()
+        snapshot = self._snapshot
+        if snapshot and monotonic() - self._checked_at < self.version_check_seconds:
+            self._record_hit(start)
+            return snapshot
+
+        version = await self._remote_version()
+        if snapshot and version is not None and snapshot.version == version:
+            self._checked_at = monotonic()
+            self._record_hit(start)
+            return snapshot
+
+        async with self._load_lock:
+            # Another request may have reloaded while this one waited
+            snapshot = self._snapshot
+            if snapshot and version is not None and snapshot.version == version:
+                self._record_hit(start)
+                return snapshot
+
+            # The version is read before loading, so a mutation racing the load bumps it past this snapshot
+            snapshot = await self._load(version)
+            self._snapshot = snapshot if version is not None else None
+            self._checked_at = monotonic()
+            self.loads += 1
+            self.load_time_s += perf_counter() - start
+
+        return snapshot
+
+    def _record_hit(self, start: float) -> None:
+        self.hits += 1
+        self.hit_time_s += perf_counter() - start
+
+    @staticmethod
+    async def _load(version: int | None) -> CatalogueSnapshot:
+        async with get_session_context() as session:
+            # One snapshot for the three reads, so every tid and eid they reference is in the others
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            tag_rows = (await session.execute(select(Tag.tid, Tag.tag_name, Tag.tag_color)
+                                              .order_by(Tag.tag_name.desc()))).all()
+            tid_rows = (await session.execute(select(exercise_tags.c.eid, exercise_tags.c.tid))).all()
+            exercise_rows = (await session.execute(
+                select(Exercise.eid, Exercise.exercise_slug, Exercise.exercise_name, Exercise.meta_data)
+                .order_by(Exercise.exercise_slug.desc()))).all()
+
+        tags = [row._asdict() for row in tag_rows]
+        tags_by_tid = {tag["tid"]: tag for tag in tags}
+
+        tids_by_eid: dict[UUID, list[UUID]] = {}
+        for eid, tid in tid_rows:
+            tids_by_eid.setdefault(eid, []).append(tid)
+
+        exercises = [
+            {**row._asdict(), "tags": [tags_by_tid[tid] for tid in tids_by_eid.get(row.eid, ())]}
+            for row in exercise_rows
+        ]
+
+        return CatalogueSnapshot(
+            version=version,
+            exercises=exercises,
+            eids_by_slug={exercise["exercise_slug"]: exercise["eid"] for exercise in exercises},
+            tags=tags,
+            tags_by_tid=tags_by_tid,
+            tids_by_name={tag["tag_name"]: tag["tid"] for tag in tags},
+            tids_by_eid=tids_by_eid,
+        )
+
+    async def invalidate(self) -> None:
+        """ Call after committing an exercise or tag mutation """
+        self._snapshot = None
+        self.invalidations += 1
+        try:
+            await redis_client.incr(CATALOGUE_VERSION_KEY)
+        except redis.RedisError as e:
+            logging.warning(f"Catalogue version not bumped, other workers may serve a stale catalogue: {e}")
+
+    def clear(self) -> None:
+        self._snapshot = None
+
+    def stats(self) -> dict:
+        return {
+            "version": self._snapshot.version if self._snapshot else None,
+            "version_check_seconds": self.version_check_seconds,
+            "hits": self.hits,
+            "loads": self.loads,
+            "version_checks": self.version_checks,
+            "invalidations": self.invalidations,
+            # Cache path next to the database path it replaces
+            "avg_hit_us": round(self.hit_time_s / self.hits * 1e6, 1) if self.hits else 0.0,
+            "avg_load_ms": round(self.load_time_s / self.loads * 1000, 3) if self.loads else 0.0,
+        }
+
+
+catalogue_cache = CatalogueCache(version_check_seconds=Config.CATALOGUE_VERSION_CHECK_SECONDS)
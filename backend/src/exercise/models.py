@@ -14,8 +14,11 @@ class Exercise(BaseModel):
     exercise_name = Column(String, nullable=False)
     meta_data = Column(JSON, nullable=True)
     
-    logs = relationship("WorkoutLog", back_populates="exercise", lazy="selectin")
-    tags = relationship("Tag", secondary=exercise_tags, back_populates="exercises", lazy="selectin")
+    # Never loaded implicitly: an exercise is shared by every user's logs, so loading them with it
+    # would make each exercise read (and each joined WorkoutLog.exercise) scale with the global log count
+    logs = relationship("WorkoutLog", back_populates="exercise", lazy="raise", passive_deletes=True)
+    tags = relationship("Tag", secondary=exercise_tags, back_populates="exercises", lazy="selectin",
+                        passive_deletes=True)
 
     def __repr__(self):
         return f"Exercise {self.exercise_slug}"
\ No newline at end of file
@@ -1,16 +1,15 @@
 from fastapi import APIRouter, Depends, status
 from fastapi.exceptions import HTTPException
 from src.exercise.service import ExerciseService
-from src.exercise.schemas import ExerciseBase, ExerciseCreate, ExerciseUpdate, ExerciseResponse
+from src.exercise.schemas import ExerciseBase, ExerciseCreate, ExerciseUpdate, ExerciseResponse, ExerciseBulkCreate
 from src.db.db import get_session
-from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src.auth.dependencies import access_token_bearer, RoleChecker
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 exercise_router = APIRouter()
 exercise_service = ExerciseService()
-access_token_bearer = AccessTokenBearer()
 role_checker = RoleChecker(["user", "admin"])
 
 
@@ -60,6 +59,18 @@ async def create_exercise(
     return new_exercise
 
 
+@exercise_router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=List[ExerciseResponse],
+                      dependencies=[Depends(role_checker)])
+async def create_exercises_bulk(
+    bulk_data: ExerciseBulkCreate,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)
+):
+    new_exercises = await exercise_service.create_exercises_bulk(bulk_data, session)
+
+    return new_exercises
+
+
 @exercise_router.patch("/{exercise_slug}", response_model=ExerciseBase, 
                        dependencies=[Depends(role_checker)])
 async def update_exercise(
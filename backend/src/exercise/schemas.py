@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, ClassVar, Set, List
 from src.tags.schemas import TagBase
 
@@ -14,4 +14,10 @@ class ExerciseUpdate(ExerciseCreate):
     new_slug: str
 
 class ExerciseResponse(ExerciseBase):
-    tags: List[TagBase]
\ No newline at end of file
+    tags: List[TagBase]
+
+# Upper bound on exercises per bulk import, keeps each multi-row INSERT well under the driver's bind parameter limit
+MAX_BULK_EXERCISES = 500
+
+class ExerciseBulkCreate(BaseModel):
+    exercises: List[ExerciseCreate] = Field(min_length=1, max_length=MAX_BULK_EXERCISES)
@@ -2,20 +2,24 @@ from fastapi import status
 from fastapi.exceptions import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.exercise.models import Exercise
-from src.exercise.schemas import ExerciseCreate, ExerciseUpdate
-from src.tags.models import Tag
+from src.exercise.cache import catalogue_cache
+from src.exercise.schemas import ExerciseCreate, ExerciseUpdate, ExerciseBulkCreate
+from src.tags.models import Tag, exercise_tags
 from src.tags.service import TagService
-from sqlalchemy import select
+from sqlalchemy import select, delete, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
-from uuid import UUID
+from collections import Counter
+from uuid import UUID, uuid4
+
+# SQLSTATE of a foreign key violation
+FOREIGN_KEY_VIOLATION = "23503"
 
 class ExerciseService:
     async def get_all_exercises(self, session: AsyncSession):
-        statement = select(Exercise).options(selectinload(Exercise.tags))\
-            .order_by(Exercise.exercise_slug.desc())
-        result = await session.execute(statement)
-        
-        return result.scalars().all()
+        catalogue = await catalogue_cache.get()
+
+        return catalogue.exercises
 
     async def get_exercise_by_slug(self, exercise_slug: str, session: AsyncSession):
         statement = select(Exercise).options(selectinload(Exercise.tags))\
@@ -56,10 +60,49 @@ class ExerciseService:
 
         session.add(new_exercise)
         await session.commit()
+        await catalogue_cache.invalidate()
         await session.refresh(new_exercise)
 
         return new_exercise
     
+    async def create_exercises_bulk(self, bulk_data: ExerciseBulkCreate, session: AsyncSession):
+        """
+        Creates many exercises and their exercise_tags links with one multi-row INSERT each, in one transaction.
+        Nothing is created if any slug already exists or any tag does not.
+        """
+        slugs = [exercise.exercise_slug for exercise in bulk_data.exercises]
+        duplicates = sorted(slug for slug, count in Counter(slugs).items() if count > 1)
+        if duplicates:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail=f"Duplicate exercise slugs: {', '.join(duplicates)}")
+
+        res = await session.execute(select(Exercise.exercise_slug).where(Exercise.exercise_slug.in_(slugs)))
+        existing = sorted(res.scalars())
+        if existing:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail=f"Exercise already exists: {', '.join(existing)}")
+
+        tags = await TagService.resolve_tag_slugs(
+            [tag_slug for exercise in bulk_data.exercises for tag_slug in exercise.tag_slugs], session)
+
+        created = []
+        links = []
+        for exercise in bulk_data.exercises:
+            exercise_dict = exercise.model_dump()
+            tag_slugs = list(dict.fromkeys(exercise_dict.pop("tag_slugs")))
+            exercise_dict["eid"] = uuid4()
+            links += [{"eid": exercise_dict["eid"], "tid": tags[tag_slug]["tid"]} for tag_slug in tag_slugs]
+            created.append(exercise_dict | {"tags": [tags[tag_slug] for tag_slug in tag_slugs]})
+
+        await session.execute(insert(Exercise).values([
+            {k: v for k, v in exercise.items() if k != "tags"} for exercise in created]))
+        if links:
+            await session.execute(insert(exercise_tags).values(links))
+        await session.commit()
+        await catalogue_cache.invalidate()
+
+        return created
+    
     async def update_exercise(self, update_data: ExerciseUpdate, session: AsyncSession):
         # Get exercise ORM object
         exercise = await self.get_exercise_by_slug(update_data.exercise_slug, session)
@@ -80,33 +123,63 @@ class ExerciseService:
             setattr(exercise, k, v)
         
         await session.commit()
+        await catalogue_cache.invalidate()
         await session.refresh(exercise)
 
         return exercise
     
     async def delete_exercise(self, exercise_slug: str, session: AsyncSession):
-        # Remove from exercise_tags
-        statement = select(Exercise).options(selectinload(Exercise.tags))\
-        .where(Exercise.exercise_slug == exercise_slug)
+        # exercise_tags rows, workout logs and personal records go with it through ON DELETE CASCADE
+        statement = delete(Exercise).where(Exercise.exercise_slug == exercise_slug).returning(Exercise.eid)
         res = await session.execute(statement)
-        exercise = res.scalar_one_or_none()
-        if not exercise:
+        if res.scalar_one_or_none() is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, 
                         detail="Exercise does not exist.")
-        exercise.tags.clear()
-        await session.flush()
 
-        # Remove associated workout logs (mandatory due to FKEY)
-        from src.workout_logs.service import WorkoutLogService
-        _ = await WorkoutLogService.delete_log_by_exercise_slug(exercise.exercise_slug, session)
-
-        await session.delete(exercise)
         await session.commit()
+        await catalogue_cache.invalidate()
         return
 
-    @classmethod
-    async def get_eid_from_slug(cls, exercise_slug: str, session: AsyncSession):
-        exercise_service = cls()
-        exercise = await exercise_service.get_exercise_by_slug(exercise_slug, session)
-        
-        return exercise.eid
\ No newline at end of file
+    @staticmethod
+    async def get_eid_from_slug(exercise_slug: str, session: AsyncSession) -> UUID:
+        catalogue = await catalogue_cache.get()
+        eid = catalogue.eids_by_slug.get(exercise_slug)
+        if eid is not None:
+            return eid
+
+        # The exercise may have been created by another worker since the catalogue was loaded
+        return await ExerciseService._get_eid_from_db(exercise_slug, session)
+
+    @staticmethod
+    async def _get_eid_from_db(exercise_slug: str, session: AsyncSession) -> UUID:
+        # Single column read on the unique slug index
+        statement = select(Exercise.eid).where(Exercise.exercise_slug == exercise_slug)
+        result = await session.execute(statement)
+        eid = result.scalar_one_or_none()
+        if eid is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail="Exercise does not exist.")
+
+        return eid
+
+    @staticmethod
+    async def raise_if_exercise_deleted(exercise_slug: str, error: IntegrityError, session: AsyncSession):
+        """
+        For a write that failed with error after referencing the eid from get_eid_from_slug, whose catalogue
+        may still hold an exercise another worker has just deleted. On a foreign key violation the session
+        is rolled back and a 404 raised if the exercise is gone. Otherwise returns, the caller re-raises.
+        """
+        if getattr(error.orig, "sqlstate", None) != FOREIGN_KEY_VIOLATION:
+            return
+        await session.rollback()
+        catalogue_cache.clear()
+        await ExerciseService._get_eid_from_db(exercise_slug, session)
+
+    @staticmethod
+    async def get_exercise_columns_by_slugs(exercise_slugs: list[str], session: AsyncSession) -> dict:
+        """ Resolves many slugs in one query, returns {slug: row} of the columns a log response needs """
+        statement = select(Exercise.eid, Exercise.exercise_slug, Exercise.exercise_name, Exercise.meta_data)\
+            .where(Exercise.exercise_slug.in_(set(exercise_slugs)))
+        result = await session.execute(statement)
+
+        return {row.exercise_slug: row for row in result}
@@ -8,7 +8,7 @@
 # 'UC_7lEuEKvFt63jtvZYwlHMQ' # Eugene Teo
 # 'UCf33v9eZOy59r7HM44ni_4Q' # BasementBodybuilding
 
-from src.ingestion.utils import ChromaDBLocalGPUEmbedder
+from src.ingestion.utils import ChromaDBLocalGPUEmbedder, notify_collections_changed
 from src.ingestion.yt_ingestor import YoutubeIngestor
 from src.config import Config
 
@@ -27,9 +27,11 @@ CHANNEL_IDS = [
 
 if __name__ ==  '__main__':
     # Check for (new) transcripts and scrape
-    embed_model = ChromaDBLocalGPUEmbedder(model_name=HF_EMBED_MODEL_NAME, device="cuda")
+    # Stored document vectors stay full precision, only query encoding may be quantized
+    embed_model = ChromaDBLocalGPUEmbedder.from_config(quantize=False)
     yt_ingestor = YoutubeIngestor(channel_ids=CHANNEL_IDS, transcript_dir=TRANSCRIPT_PATH, hf_embed_model=embed_model)
     _ = yt_ingestor.scrape_new_transcripts(YT_API_KEY, retry_failed=True)
     _ = yt_ingestor.summarize_saved_transcripts(model_name='gpt-5-mini')
     _ = yt_ingestor.vectorize_transcript_summaries(vdb_path=CHROMA_VDB_PATH)
+    notify_collections_changed()
     
\ No newline at end of file
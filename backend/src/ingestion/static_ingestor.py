@@ -11,7 +11,7 @@ import json
 from docling.document_converter import DocumentConverter
 from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
 
-from src.ingestion.utils import ChromaDBLocalGPUEmbedder
+from src.ingestion.utils import ChromaDBLocalGPUEmbedder, notify_collections_changed
 from src.config import Config
 import chromadb
 
@@ -242,7 +242,7 @@ def all_vectorize():
     ]
     client = chromadb.PersistentClient(path=VDB_PATH)
     collection = client.create_collection(name="txtbks",
-                                        embedding_function=ChromaDBLocalGPUEmbedder(HF_EMBED_MODEL_NAME, device="cuda"),
+                                        embedding_function=ChromaDBLocalGPUEmbedder.from_config(quantize=False),
                                         get_or_create=True)
 
     for source in sources:
@@ -253,6 +253,7 @@ def all_vectorize():
                 documents=data['chunks'],
                 metadatas=data['metadatas']
             )
+    notify_collections_changed()
     return
 
 all_vectorize()
@@ -3,22 +3,161 @@ __import__('pysqlite3')
 import sys
 sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
 
+import logging
+import os
+import platform
+import numpy as np
+import httpx
 from chromadb import EmbeddingFunction, Documents, Embeddings
 from sentence_transformers import SentenceTransformer
 import torch
+from src.config import Config
+
+CPU_BACKENDS = ("torch", "onnx", "openvino")
+MAX_AUTO_BATCH_SIZE = 256
+CHARS_PER_TOKEN = 3 # conservative, over-estimating a text's length only shrinks the batch
+# Share of the free device memory (or available RAM on CPU) an auto-sized batch may take
+AUTO_BATCH_MEMORY_FRACTION = 0.5
+
+
+def resolve_device(device: str = "auto") -> str:
+    """ "auto" picks CUDA, then Apple MPS, then CPU """
+    if device != "auto":
+        return device
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+def cpu_quantization_config() -> str:
+    """ ONNX Runtime dynamic int8 quantization preset matching this CPU's instruction set """
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return "avx2"
+    for preset in ("avx512_vnni", "avx512", "avx2"):
+        if preset in flags:
+            return preset
+    return "avx2"
+
+def notify_collections_changed() -> None:
+    """ Has a running ML service re-resolve its collection handles, best effort """
+    try:
+        httpx.post(f"{Config.ML_SERVICE_ENDPOINT}/_refresh_collections", timeout=10.0).raise_for_status()
+    except httpx.HTTPError as e:
+        logging.warning(f"ML service not notified of collection changes, it refreshes on its next miss: {e}")
+
 
 class ChromaDBLocalGPUEmbedder(EmbeddingFunction[Documents]):
     """
-    Custom ChromaDB Embedding Function to utilize GPU (cuda) w/ HF models
+    Custom ChromaDB Embedding Function for local HF models. Runs on CUDA/MPS when available, otherwise on
+    the CPU through ONNX Runtime (optionally dynamically int8 quantized) or OpenVINO, falling back to torch
+    when their extras (sentence-transformers[onnx] / [openvino]) are missing or the model does not export.
+    model_id names the exact variant, vectors of different variants must not be mixed in caches.
+    batch_size=None sizes each call's batches from free memory and the length of its longest text.
     """
-    def __init__(self, model_name: str, device="cuda", batch_size=2):
-        self.model = SentenceTransformer(model_name, device=device)
-        self.batch_size = 2
-    
+    def __init__(self, model_name: str, device="auto", batch_size: int | None = None, cpu_backend="onnx",
+                 quantize=True, cpu_threads: int | None = None):
+        self.device = resolve_device(device)
+        self.model_id = model_name
+        if cpu_threads and self.device == "cpu":
+            torch.set_num_threads(cpu_threads)
+
+        if self.device == "cpu" and cpu_backend != "torch":
+            try:
+                self.model = self._load_cpu_model(model_name, cpu_backend, quantize, cpu_threads)
+            except Exception as e:
+                logging.warning(f"{cpu_backend} backend unavailable for {model_name}, using torch on CPU: {e}")
+                self.model = SentenceTransformer(model_name, device="cpu")
+        else:
+            self.model = SentenceTransformer(model_name, device=self.device)
+        self.batch_size = batch_size or None
+
+    @classmethod
+    def from_config(cls, **kwargs) -> "ChromaDBLocalGPUEmbedder":
+        options = dict(model_name=Config.HF_EMBED_MODEL_NAME,
+                       device=Config.EMBED_DEVICE,
+                       cpu_backend=Config.EMBED_CPU_BACKEND,
+                       quantize=Config.EMBED_CPU_QUANTIZE,
+                       cpu_threads=Config.EMBED_CPU_THREADS or None,
+                       batch_size=Config.EMBED_BATCH_SIZE or None)
+        return cls(**(options | kwargs))
+
+    def _load_cpu_model(self, model_name: str, cpu_backend: str, quantize: bool, cpu_threads: int | None):
+        if cpu_backend not in CPU_BACKENDS:
+            raise ValueError(f"Unknown CPU backend {cpu_backend}, expected one of {CPU_BACKENDS}")
+
+        if cpu_backend == "openvino":
+            model_kwargs = {"ov_config": {"INFERENCE_NUM_THREADS": cpu_threads}} if cpu_threads else {}
+            self.model_id = f"{model_name}:openvino"
+            return SentenceTransformer(model_name, device="cpu", backend="openvino", model_kwargs=model_kwargs)
+
+        model_kwargs = {}
+        if cpu_threads:
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = cpu_threads
+            model_kwargs["session_options"] = session_options
+
+        if not quantize:
+            self.model_id = f"{model_name}:onnx"
+            return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+        # The export and quantization run once, later starts load the saved int8 model
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        preset = cpu_quantization_config()
+        export_dir = os.path.join(Config.EMBED_EXPORT_PATH, model_name.replace("/", "__"))
+        file_name = f"onnx/model_qint8_{preset}.onnx"
+        if not os.path.exists(os.path.join(export_dir, file_name)):
+            logging.info(f"Exporting {model_name} to ONNX with {preset} int8 quantization in {export_dir}")
+            model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+            model.save_pretrained(export_dir)
+            export_dynamic_quantized_onnx_model(model, preset, export_dir)
+
+        self.model_id = f"{model_name}:onnx-qint8-{preset}"
+        return SentenceTransformer(export_dir, device="cpu", backend="onnx",
+                                   model_kwargs={"file_name": file_name, **model_kwargs})
+
+    def _free_memory_bytes(self) -> int:
+        if self.device == "cuda":
+            free, _ = torch.cuda.mem_get_info()
+            # Blocks cached by torch's allocator are free for this process too
+            return free + torch.cuda.memory_reserved() - torch.cuda.memory_allocated()
+        if self.device == "mps":
+            return torch.mps.recommended_max_memory() - torch.mps.driver_allocated_memory()
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+    def auto_batch_size(self, seq_len: int) -> int:
+        """
+        Largest power of two batch whose peak inference activations fit in a share of free memory. Per
+        sequence, one layer at a time is live: hidden states and the MLP expansion, plus the attention
+        scores (quadratic in the sequence length).
+        """
+        config = getattr(self.model[0].auto_model, "config", None)
+        hidden = getattr(config, "hidden_size", 1024)
+        intermediate = getattr(config, "intermediate_size", 4 * hidden)
+        heads = getattr(config, "num_attention_heads", 16)
+        weight = next(self.model.parameters(), None) # none on the ONNX/OpenVINO backends, which run in fp32
+        dtype_bytes = weight.element_size() if weight is not None else 4
+
+        per_sequence = dtype_bytes * (seq_len * (4 * hidden + 2 * intermediate) + heads * seq_len ** 2)
+        fits = int(self._free_memory_bytes() * AUTO_BATCH_MEMORY_FRACTION // per_sequence)
+        return max(1, min(MAX_AUTO_BATCH_SIZE, 1 << max(fits, 1).bit_length() - 1))
+
+    def _batch_size_for(self, input: Documents) -> int:
+        if self.batch_size:
+            return self.batch_size
+        longest = max(len(text) for text in input) // CHARS_PER_TOKEN + 2 # + special tokens
+        return self.auto_batch_size(min(longest, self.model.max_seq_length or longest))
+
     def __call__(self, input: Documents) -> Embeddings:
-        with torch.no_grad():
-            all_embeddings = []
-            for i in range(0, len(input), self.batch_size):
-                all_embeddings += self.model.encode(input[i:i + self.batch_size], convert_to_numpy=True).tolist()
-            return all_embeddings
-        # return self.model.encode(input, convert_to_numpy=True).tolist()
\ No newline at end of file
+        if len(input) == 0:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        # encode() orders the texts by length, so each batch pads to similar lengths, and returns them in
+        # input order as one array, rows are handed to Chroma without converting them to Python lists
+        embeddings = self.model.encode(list(input), batch_size=self._batch_size_for(input), convert_to_numpy=True)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
@@ -7,7 +7,10 @@ from src.exercise.routes import exercise_router
 from src.auth.routes import auth_router
 from src.tags.routes import tag_router
 from src.rag.routes import rag_router
+from src.metrics.routes import metrics_router
+from src.analytics.routes import analytics_router
 from src.db.db import init_db, get_session_context
+from src.db.redis_cache import blocklist_mirror
 from src.exercise.service import ExerciseService
 from src.workout_logs.service import WorkoutLogService
 from src.auth.service import UserService
@@ -76,7 +79,9 @@ async def startup(app: FastAPI):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         seed_data_path = os.path.join(current_dir, "tests", "seed_data.json")
         await load_seed_data(seed_data_path)
+    await blocklist_mirror.start()
     yield
+    await blocklist_mirror.stop()
 
 app = FastAPI(
     lifespan=startup,
@@ -91,6 +96,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.add_middleware(
@@ -102,4 +108,6 @@ app.include_router(workout_logs_router, prefix=f"{version_prefix}/workout_log",
 app.include_router(exercise_router, prefix=f"{version_prefix}/exercise", tags=['exercises'])
 app.include_router(auth_router, prefix=f"{version_prefix}/user", tags=['users'])
 app.include_router(tag_router, prefix=f"{version_prefix}/tag", tags=["tags"])
-app.include_router(rag_router, prefix=f"{version_prefix}/rag", tags=["rag"])
\ No newline at end of file
+app.include_router(rag_router, prefix=f"{version_prefix}/rag", tags=["rag"])
+app.include_router(metrics_router, prefix=f"{version_prefix}/metrics", tags=["metrics"])
+app.include_router(analytics_router, prefix=f"{version_prefix}/analytics", tags=["analytics"])
\ No newline at end of file
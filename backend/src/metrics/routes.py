@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from src.auth.dependencies import RoleChecker
+from src.auth.cache import principal_cache
+from src.auth.utils import pwd_hash_pool
+from src.db.redis_cache import blocklist_mirror
+from src.db.db import get_pool_stats
+from src.exercise.cache import catalogue_cache
+from src.analytics.user_context import user_context_cache
+
+metrics_router = APIRouter()
+role_checker = RoleChecker(["admin"])
+
+
+# Process-local counters, each API worker reports its own numbers
+@metrics_router.get("/", dependencies=[Depends(role_checker)])
+async def get_metrics():
+    return {
+        "principal_cache": principal_cache.stats(),
+        "pwd_hash_pool": pwd_hash_pool.stats(),
+        "blocklist_mirror": blocklist_mirror.stats(),
+        "catalogue_cache": catalogue_cache.stats(),
+        "user_context_cache": user_context_cache.stats(),
+        "db_pool": get_pool_stats()
+    }
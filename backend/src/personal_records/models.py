@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Date, DateTime, Float, func, ForeignKey
+from sqlalchemy.schema import Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from src.db.base_model import BaseModel
+
+
+class PersonalRecord(BaseModel):
+    """
+    Materialized personal records of a user for one exercise, kept current by WorkoutLogService writes.
+    The *_wid columns point at the workout log holding each record.
+    """
+    __tablename__ = "personal_records"
+
+    __table_args__ = (
+        # Records of an exercise across users (ON DELETE CASCADE from exercises)
+        Index("ix_personal_records_exercise_eid", "exercise_eid"),
+    )
+
+    user_uid = Column(UUID(as_uuid=True), ForeignKey("user_accounts.uid", ondelete="CASCADE"), primary_key=True)
+    exercise_eid = Column(UUID(as_uuid=True), ForeignKey("exercises.eid", ondelete="CASCADE"), primary_key=True)
+
+    # Heaviest set
+    max_weight = Column(Float, nullable=True)
+    max_weight_reps = Column(Float, nullable=True)
+    max_weight_date = Column(Date(), nullable=True)
+    max_weight_wid = Column(UUID(as_uuid=True), nullable=True)
+
+    # Best estimated one rep max
+    best_e1rm = Column(Float, nullable=True)
+    best_e1rm_weight = Column(Float, nullable=True)
+    best_e1rm_reps = Column(Float, nullable=True)
+    best_e1rm_date = Column(Date(), nullable=True)
+    best_e1rm_wid = Column(UUID(as_uuid=True), nullable=True)
+
+    # Most reps at each weight: {"<weight>": {"reps": float, "date_performed": "YYYY-MM-DD", "wid": "<uuid>"}}
+    rep_records = Column(JSONB, nullable=False, server_default="{}")
+
+    updated_at = Column(DateTime(timezone=False), server_default=func.current_timestamp(),
+                        onupdate=func.current_timestamp())
+
+    def __repr__(self):
+        return f"PersonalRecord {self.user_uid} {self.exercise_eid}"
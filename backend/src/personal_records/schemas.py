@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List
+from uuid import UUID
+
+
+class RecordSet(BaseModel):
+    wid: UUID
+    weight: float
+    reps: float
+    date_performed: date
+
+class E1RMRecord(RecordSet):
+    e1rm: float
+
+class PersonalRecordResponse(BaseModel):
+    exercise_slug: str
+    max_weight: RecordSet | None = None
+    best_e1rm: E1RMRecord | None = None
+    # Most reps at each weight, lightest first
+    rep_records: List[RecordSet] = []
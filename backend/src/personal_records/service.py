@@ -0,0 +1,164 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from src.personal_records.models import PersonalRecord
+from src.personal_records.schemas import PersonalRecordResponse
+from src.exercise.models import Exercise
+from src.workout_logs.models import WorkoutLog
+from datetime import date
+from uuid import UUID
+
+
+def estimate_1rm(weight: float, reps: float) -> float:
+    # Epley formula, a single is its own 1RM
+    if reps <= 1:
+        return weight
+    return weight * (1 + reps / 30)
+
+def weight_key(weight: float) -> str:
+    # Same text as Postgres' weight::numeric, so the migration backfill produces identical keys
+    return str(int(weight)) if float(weight).is_integer() else repr(float(weight))
+
+
+class PersonalRecordService:
+    """
+    Keeps personal_records current as logs are written. New or raised values are compared against the
+    stored record in O(1); only removing or changing a log that holds a record rescans that exercise.
+    """
+    async def get_records_by_slug(self, uid: UUID, exercise_slug: str, session: AsyncSession):
+        statement = select(PersonalRecord)\
+            .join(Exercise, Exercise.eid == PersonalRecord.exercise_eid)\
+            .where(PersonalRecord.user_uid == uid, Exercise.exercise_slug == exercise_slug)
+        result = await session.execute(statement)
+        record = result.scalars().first()
+        if not record:
+            return None
+
+        response = {"exercise_slug": exercise_slug}
+        if record.max_weight_wid:
+            response["max_weight"] = {
+                "wid": record.max_weight_wid,
+                "weight": record.max_weight,
+                "reps": record.max_weight_reps,
+                "date_performed": record.max_weight_date,
+            }
+        if record.best_e1rm_wid:
+            response["best_e1rm"] = {
+                "wid": record.best_e1rm_wid,
+                "weight": record.best_e1rm_weight,
+                "reps": record.best_e1rm_reps,
+                "date_performed": record.best_e1rm_date,
+                "e1rm": record.best_e1rm,
+            }
+        response["rep_records"] = sorted(
+            ({"weight": float(weight), **rep_record} for weight, rep_record in record.rep_records.items()),
+            key=lambda r: r["weight"]
+        )
+
+        return PersonalRecordResponse.model_validate(response)
+
+    async def _lock_record(self, uid: UUID, exercise_eid: UUID, session: AsyncSession, create: bool = True):
+        if create:
+            # Concurrent first logs of an exercise must not race on the primary key
+            await session.execute(insert(PersonalRecord)
+                                  .values(user_uid=uid, exercise_eid=exercise_eid, rep_records={})
+                                  .on_conflict_do_nothing())
+        statement = select(PersonalRecord)\
+            .where(PersonalRecord.user_uid == uid, PersonalRecord.exercise_eid == exercise_eid)\
+            .with_for_update()\
+            .execution_options(populate_existing=True)
+        result = await session.execute(statement)
+
+        return result.scalars().first()
+
+    @staticmethod
+    def _apply(record: PersonalRecord, wid: UUID, weight: float, reps: float, date_performed: date) -> None:
+        # Ties go to the most recent log, matching the historical PR ordering
+        if record.max_weight is None or (weight, date_performed) > (record.max_weight, record.max_weight_date):
+            record.max_weight = weight
+            record.max_weight_reps = reps
+            record.max_weight_date = date_performed
+            record.max_weight_wid = wid
+
+        e1rm = estimate_1rm(weight, reps)
+        if record.best_e1rm is None or (e1rm, date_performed) > (record.best_e1rm, record.best_e1rm_date):
+            record.best_e1rm = e1rm
+            record.best_e1rm_weight = weight
+            record.best_e1rm_reps = reps
+            record.best_e1rm_date = date_performed
+            record.best_e1rm_wid = wid
+
+        key = weight_key(weight)
+        current = record.rep_records.get(key)
+        if current is None or (reps, date_performed.isoformat()) > (current["reps"], current["date_performed"]):
+            # Reassigned rather than mutated in place so the JSONB change is detected
+            record.rep_records = {
+                **record.rep_records,
+                key: {"reps": reps, "date_performed": date_performed.isoformat(), "wid": str(wid)}
+            }
+
+    @staticmethod
+    def _holds(record: PersonalRecord, wid: UUID) -> bool:
+        return record.max_weight_wid == wid or record.best_e1rm_wid == wid or \
+            any(rep_record["wid"] == str(wid) for rep_record in record.rep_records.values())
+
+    async def recompute(self, uid: UUID, exercise_eid: UUID, session: AsyncSession) -> None:
+        """ Rebuilds one user's records for one exercise from their logs """
+        record = await self._lock_record(uid, exercise_eid, session, create=False)
+
+        statement = select(WorkoutLog.wid, WorkoutLog.weight, WorkoutLog.reps, WorkoutLog.date_performed)\
+            .where(WorkoutLog.user_uid == uid, WorkoutLog.exercise_eid == exercise_eid)
+        logs = (await session.execute(statement)).all()
+
+        if not logs:
+            if record:
+                await session.delete(record)
+            return
+        if not record:
+            record = await self._lock_record(uid, exercise_eid, session)
+
+        for column in ("max_weight", "max_weight_reps", "max_weight_date", "max_weight_wid",
+                       "best_e1rm", "best_e1rm_weight", "best_e1rm_reps", "best_e1rm_date", "best_e1rm_wid"):
+            setattr(record, column, None)
+        record.rep_records = {}
+        for log in logs:
+            self._apply(record, log.wid, log.weight, log.reps, log.date_performed)
+
+    async def record_log(self, log, session: AsyncSession) -> None:
+        """ Compares a new (or raised) log against the stored records """
+        record = await self._lock_record(log.user_uid, log.exercise_eid, session)
+        self._apply(record, log.wid, log.weight, log.reps, log.date_performed)
+
+    async def record_logs(self, logs: list, session: AsyncSession) -> None:
+        """ Batch form of record_log, each (user_uid, exercise_eid) record is locked once """
+        logs_by_pair: dict[tuple[UUID, UUID], list] = {}
+        for log in logs:
+            logs_by_pair.setdefault((log.user_uid, log.exercise_eid), []).append(log)
+
+        # Fixed lock order so concurrent batches touching the same records cannot deadlock
+        for (uid, exercise_eid), pair_logs in sorted(logs_by_pair.items(), key=lambda item: item[0]):
+            record = await self._lock_record(uid, exercise_eid, session)
+            for log in pair_logs:
+                self._apply(record, log.wid, log.weight, log.reps, log.date_performed)
+
+    async def update_log(self, log, old_exercise_eid: UUID, session: AsyncSession) -> None:
+        """ Call after an updated log has been flushed, with the exercise it belonged to before """
+        old_record = await self._lock_record(log.user_uid, old_exercise_eid, session, create=False)
+        if old_record and self._holds(old_record, log.wid):
+            # The log's old values may have been a record, so they cannot simply be compared away
+            await self.recompute(log.user_uid, old_exercise_eid, session)
+            if old_exercise_eid == log.exercise_eid:
+                return
+
+        await self.record_log(log, session)
+
+    async def remove_logs(self, logs: list[tuple[UUID, UUID, UUID]], session: AsyncSession) -> None:
+        """ Call after deleting logs given as (user_uid, exercise_eid, wid), rescans only records they held """
+        wids_by_pair: dict[tuple[UUID, UUID], set[UUID]] = {}
+        for uid, exercise_eid, wid in logs:
+            wids_by_pair.setdefault((uid, exercise_eid), set()).add(wid)
+
+        for (uid, exercise_eid), wids in wids_by_pair.items():
+            record = await self._lock_record(uid, exercise_eid, session, create=False)
+            if record and any(self._holds(record, wid) for wid in wids):
+                await self.recompute(uid, exercise_eid, session)
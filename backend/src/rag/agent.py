@@ -1,5 +1,7 @@
 import re
 import json
+import asyncio
+import logging
 from typing import List
 from langchain_core.tools import StructuredTool
 from langgraph.graph import MessagesState, StateGraph, END
@@ -9,6 +11,8 @@ from typing import Annotated
 from src.rag.retriever import Retriever
 from src.rag.resource_pool import ResourcePool
 
+logger = logging.getLogger("uvicorn.error")
+
 class Agent():
     """ 
     Class for all LLM invoking methods and LangGraph/LangChain graph methods.
@@ -57,10 +61,9 @@ class Agent():
 
         research_queries, embedding_queries = await self.gen_retrieval_queries(context_str)
         print(f"Research Queries: {research_queries} \n Embedding queries: {embedding_queries}")
-        print("Retrieving embedded chunks PENGU")
-        chunks = Retriever.retrieve_embedded_chunks(embedding_queries)
-        print("Retrieving research papers PENGU")
-        papers = Retriever.retrieve_exa_papers(research_queries)
+        logger.debug("Retrieving embedded chunks and research papers")
+        chunks, papers = await asyncio.gather(Retriever.retrieve_embedded_chunks(embedding_queries),
+                                              Retriever.retrieve_exa_papers(research_queries))
         
         # Serialize to string
         ts_str = f"Transcript Chunks: \n {json.dumps(chunks['transcript_chunks'])}"
@@ -0,0 +1,116 @@
+# Bounded cache of query embeddings: in-process LRU, optionally shared through Redis as float16 bytes
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable
+import numpy as np
+import redis.asyncio as redis
+from src.db.redis_cache import redis_client
+
+
+class QueryEmbeddingCache:
+    """
+    Retrieval queries generated by the LLM repeat a lot across users, so their vectors are reused instead of
+    re-running the embedding model. Keys hash the model name with the exact text given to the model
+    (instruction prefix included), so changing either never serves stale vectors. Vectors are kept in
+    Redis for redis_ttl_seconds (0 keeps them in process only) as float16, half the bytes at a precision
+    far below what separates neighbours in cosine ranking.
+    """
+    def __init__(self, model_name: str, max_size: int, redis_ttl_seconds: int):
+        self.model_name = model_name
+        self.max_size = max_size
+        self.redis_ttl_seconds = redis_ttl_seconds
+
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+
+        self.local_hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(f"{self.model_name}\0{text}".encode()).hexdigest()
+        return f"query_embedding:{digest}"
+
+    def _put(self, key: str, vector: np.ndarray) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_many(self, texts: list[str],
+                       encode: Callable[[list[str]], Awaitable]) -> tuple[np.ndarray, dict]:
+        """
+        Vectors of texts (rows in input order) and this call's cache counters. Misses are encoded together
+        in one encode(texts) call.
+        """
+        keys = [self._key(text) for text in texts]
+        vectors: list[np.ndarray | None] = [None] * len(texts)
+        for i, key in enumerate(keys):
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                vectors[i] = vector
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        local_hits = len(texts) - len(missing)
+
+        remote_hits = 0
+        if missing and self.redis_ttl_seconds:
+            try:
+                values = await redis_client.mget([keys[i] for i in missing])
+            except redis.RedisError as e:
+                logging.warning(f"Query embedding cache unavailable in Redis: {e}")
+                values = [None] * len(missing)
+            for i, value in zip(missing, values):
+                if value:
+                    vectors[i] = np.frombuffer(value, dtype=np.float16).astype(np.float32)
+                    self._put(keys[i], vectors[i])
+                    remote_hits += 1
+            missing = [i for i in missing if vectors[i] is None]
+
+        if missing:
+            # A text repeated within the batch is encoded once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = dict(zip(unique_texts, np.asarray(await encode(unique_texts), dtype=np.float32)))
+            for i in missing:
+                vectors[i] = encoded[texts[i]]
+            for text, vector in encoded.items():
+                self._put(self._key(text), vector)
+            if self.redis_ttl_seconds:
+                await self._store_remote(encoded)
+
+        self.local_hits += local_hits
+        self.remote_hits += remote_hits
+        self.misses += len(missing)
+
+        return np.vstack(vectors), {
+            "cache_hits": local_hits + remote_hits,
+            "cache_misses": len(missing),
+            "cache_hit_rate": self.hit_rate(),
+        }
+
+    async def _store_remote(self, encoded: dict[str, np.ndarray]) -> None:
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for text, vector in encoded.items():
+                    pipe.set(self._key(text), vector.astype(np.float16).tobytes(), ex=self.redis_ttl_seconds)
+                await pipe.execute()
+        except redis.RedisError as e:
+            logging.warning(f"Query embeddings not stored in Redis: {e}")
+
+    def hit_rate(self) -> float:
+        lookups = self.local_hits + self.remote_hits + self.misses
+        return round((self.local_hits + self.remote_hits) / lookups, 3) if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "model_name": self.model_name,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "local_hits": self.local_hits,
+            "remote_hits": self.remote_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate(),
+        }
@@ -25,10 +25,11 @@ def stage_timer(
     stage: str,
     request_id: str,
     **fields: object,
-) -> Iterator[None]:
+) -> Iterator[dict]:
+    """ Logs the elapsed time of the block, fields added to the yielded dict inside the block are logged too """
     start = perf_counter()
     try:
-        yield
+        yield fields
     finally:
         if profiling_enabled():
             elapsed_s = perf_counter() - start
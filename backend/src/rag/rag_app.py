@@ -1,20 +1,20 @@
 from fastapi import FastAPI, Depends, Request, status
 import logging
 
-from src.auth.dependencies import AccessTokenBearer
 from src.rag.schemas import RAGRequest, RAGSingleResponse, RAGInternalRequest, ResearchResultFull
 from src.rag.rag_service import RAGService
 from src.rag.resource_pool import ResourcePool
 from src.rag.observability import new_request_id, stage_timer
 
 rag_app = FastAPI()
-access_token_bearer = AccessTokenBearer()
 logger = logging.getLogger("uvicorn.error")
 
 @rag_app.on_event("startup")
 async def startup():
     """Initialize singleton resources on app startup"""
     ResourcePool.initialize()
+    with stage_timer(logger, "ml_warmup", "startup", collections=len(ResourcePool.collections)):
+        ResourcePool.warmup()
     rag_app.state.rag_service = RAGService()
 
 def get_rag_service(request: Request) -> RAGService:
@@ -49,6 +49,11 @@ async def _generate_research(
         )
     return research_result
 
+@rag_app.post("/_refresh_collections", response_model=list[str])
+async def _refresh_collections():
+    """ Called by ingestion after it creates or recreates a collection, returns the collections now held """
+    return ResourcePool.refresh_collections()
+
 @rag_app.get("/_get_available_models", response_model=list[str])
 async def _get_available_models(
 ):
@@ -1,17 +1,20 @@
 import uuid
 import json
+import asyncio
 import logging
 from langchain_core.messages import SystemMessage, HumanMessage
 import re
 
 from src.rag.agent import Agent
 from src.rag.retriever import Retriever
+from src.analytics.user_context import dump_context
 # from src.rag.resource_pool import ResourcePool
 from src.rag.schemas import ResearchResultFull
 from datetime import datetime, timezone
 from uuid import UUID
 from src.rag.resource_pool import ResourcePool
 from src.rag.observability import stage_timer, new_request_id
+from src.config import Config
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -26,7 +29,7 @@ class RAGService():
         Creates a new message history and agent response given a user (user ID) and initial query message.
         """
         user_data = await Retriever.get_user_data(user_uid)
-        user_data_str = json.dumps(user_data, indent=2)
+        user_data_str = dump_context(user_data)
 
         # note: user data is seeded into the conversation to provide user context to all LLM invocations using the state
         state = await self.agent.graph.ainvoke({"messages": [SystemMessage(self.agent.SYSTEM_PROMPT)] + [HumanMessage(user_data_str)] + [HumanMessage(query)]})
@@ -41,7 +44,62 @@ class RAGService():
             logger.warning(f"Last message is not an AIMessage. \n Type: {final_msg.type} \n Content: {final_msg.content}")
 
         return final_msg
-    
+
+    @staticmethod
+    async def _retrieval_leg(stage: str, leg, deadline: float, req_id: str, span_fields: dict | None = None) -> list:
+        """
+        Awaits one retrieval leg until deadline (event loop time), a leg that fails or times out yields no
+        results instead of failing the request. A timed out executor job still runs to completion in its
+        thread, its result is dropped. span_fields filled in by the leg are logged with its span.
+        """
+        with stage_timer(logger, stage, req_id) as span:
+            try:
+                results = await asyncio.wait_for(leg, timeout=max(0.0, deadline - asyncio.get_running_loop().time()))
+                span["status"] = "ok"
+                span["results"] = len(results)
+                return results
+            except asyncio.TimeoutError:
+                span["status"] = "timeout"
+            except Exception as e:
+                span["status"] = "error"
+                logger.warning(f"Retrieval leg {stage} failed, continuing without it: {e!r}")
+            finally:
+                span.update(span_fields or {})
+        return []
+
+    async def retrieve_all(self, embedding_queries: list[str], research_queries: list[str], req_id: str):
+        """
+        Fans out every retrieval leg (each Chroma collection, each paper search) at once, so retrieval takes
+        as long as the slowest leg rather than the sum of all legs. Returns (chunks, papers). The embedding
+        pass and the collection queries after it share one RAG_VECTOR_TIMEOUT_SECONDS deadline.
+        """
+        now = asyncio.get_running_loop().time()
+        vector_deadline = now + Config.RAG_VECTOR_TIMEOUT_SECONDS
+        search_deadline = now + Config.RAG_SEARCH_TIMEOUT_SECONDS
+
+        async def vector_legs():
+            # One batched encoding pass, then both collections are searched with the same vectors
+            cache_fields = {}
+            query_embeddings = await self._retrieval_leg("ml_embed_queries",
+                                                         Retriever.embed_queries(embedding_queries, cache_fields),
+                                                         vector_deadline, req_id, cache_fields)
+            return await asyncio.gather(
+                self._retrieval_leg("ml_retrieve_yt_transcripts",
+                                    Retriever.query_collection("yt_transcripts", query_embeddings, 10),
+                                    vector_deadline, req_id),
+                self._retrieval_leg("ml_retrieve_txtbks",
+                                    Retriever.query_collection("txtbks", query_embeddings, 5),
+                                    vector_deadline, req_id))
+
+        paper_legs = [self._retrieval_leg("ml_retrieve_papers", Retriever.search_papers(query),
+                                          search_deadline, req_id)
+                      for query in research_queries]
+        with stage_timer(logger, "ml_retrieval_fanout", req_id, legs=len(paper_legs) + 3):
+            (transcript_chunks, txtbk_chunks), *paper_lists = await asyncio.gather(vector_legs(), *paper_legs)
+
+        chunks = {'transcript_chunks': transcript_chunks, 'txtbk_chunks': txtbk_chunks}
+        return chunks, [paper for papers in paper_lists for paper in papers]
+
     async def generate_research(
         self,
         user_uid: str,
@@ -58,10 +116,7 @@ class RAGService():
 
         with stage_timer(logger, "ml_query_generation", req_id):
             research_queries, embedding_queries = await Retriever.gen_retrieval_queries(query, llm_obj)
-        with stage_timer(logger, "ml_retrieve_embedded_chunks", req_id):
-            chunks = Retriever.retrieve_embedded_chunks(embedding_queries)
-        with stage_timer(logger, "ml_retrieve_papers", req_id):
-            papers = Retriever.retrieve_exa_papers(research_queries)
+        chunks, papers = await self.retrieve_all(embedding_queries, research_queries, req_id)
 
         ts_str = ""
         for i, chunk in enumerate(chunks['transcript_chunks']):
@@ -3,6 +3,8 @@ import sys
 sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
 
 import chromadb
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from exa_py import Exa
 from langchain.chat_models import init_chat_model
 
@@ -10,6 +12,7 @@ from src.config import Config
 from src.auth.service import UserService
 from src.workout_logs.service import WorkoutLogService
 from src.ingestion.utils import ChromaDBLocalGPUEmbedder
+from src.rag.embedding_cache import QueryEmbeddingCache
 from langchain_openai import ChatOpenAI
 
 # Custom chat model subclass to extract reasoning tokens 
@@ -51,11 +54,16 @@ class ResourcePool:
     has_initialized = False
     
     embedder = None
+    query_embedding_cache = None
     chroma_client = None
+    collections = {} # {name[str] : chromadb Collection}, resolved once, see refresh_collections()
     exa_client = None
     llm_chat_model = None
     user_service = None
     workout_logs_service = None
+    # Blocking retrieval clients run on these, see Retriever
+    vector_executor = None
+    search_executor = None
 
     _models = {} # {model_name[str] : model[BaseChatModel]}
     
@@ -72,6 +80,8 @@ class ResourcePool:
     
     DEFAULT_LLM_MODEL = "z-ai/glm-5"
 
+    COLLECTION_NAMES = ("yt_transcripts", "txtbks")
+
     @classmethod
     def get_model(cls, model_name: str | None = None):
         # Default if model_name is null
@@ -82,7 +92,7 @@ class ResourcePool:
         return cls._models.get(model_name)
 
     @classmethod
-    def initialize(cls, embed_model_bs=2):
+    def initialize(cls, embed_model_bs: int | None = None):
         try:
             for model_name, model_config in cls.AVAILABLE_LLM_MODELS.items():
                 if model_name == 'z-ai/glm-5':
@@ -94,16 +104,29 @@ class ResourcePool:
 
         try:
             if not cls.embedder:
-                cls.embedder = ChromaDBLocalGPUEmbedder(
-                    model_name=Config.HF_EMBED_MODEL_NAME, 
-                    device='cuda',
-                    batch_size=embed_model_bs)
+                cls.embedder = ChromaDBLocalGPUEmbedder.from_config(
+                    **({"batch_size": embed_model_bs} if embed_model_bs else {}))
+
+            if not cls.query_embedding_cache:
+                cls.query_embedding_cache = QueryEmbeddingCache(
+                    model_name=cls.embedder.model_id,
+                    max_size=Config.RAG_QUERY_EMBEDDING_CACHE_SIZE,
+                    redis_ttl_seconds=Config.RAG_QUERY_EMBEDDING_REDIS_TTL_SECONDS)
 
             if not cls.chroma_client:
                 cls.chroma_client = chromadb.PersistentClient(path=Config.CHROMA_VDB_PATH)
+                cls.refresh_collections()
 
             if not cls.exa_client:
                 cls.exa_client = Exa(api_key=Config.EXA_API_KEY)
+
+            if not cls.vector_executor:
+                cls.vector_executor = ThreadPoolExecutor(max_workers=Config.RAG_VECTOR_WORKERS,
+                                                         thread_name_prefix="rag_vector")
+
+            if not cls.search_executor:
+                cls.search_executor = ThreadPoolExecutor(max_workers=Config.RAG_SEARCH_WORKERS,
+                                                         thread_name_prefix="rag_search")
             
             if not cls.user_service:
                 cls.user_service = UserService()
@@ -115,6 +138,42 @@ class ResourcePool:
         
         cls.has_initialized = True
     
+    @classmethod
+    def refresh_collections(cls) -> list[str]:
+        """
+        Resolves the collection handles (a Chroma metadata lookup each), so queries do not repeat it.
+        Runs at startup, and again when ingestion reports a new collection or a query misses one.
+        """
+        collections = {}
+        for name in cls.COLLECTION_NAMES:
+            try:
+                collections[name] = cls.chroma_client.get_collection(name=name, embedding_function=cls.embedder)
+            except Exception as e:
+                logging.warning(f"Chroma collection {name} unavailable: {e}")
+        cls.collections = collections
+        return list(collections)
+
+    @classmethod
+    def get_collection(cls, name: str):
+        collection = cls.collections.get(name)
+        if collection is None:
+            # Ingestion may have created it since the last refresh
+            cls.refresh_collections()
+            collection = cls.collections.get(name)
+        if collection is None:
+            raise Exception(f"Chroma collection {name} does not exist")
+        return collection
+
+    @classmethod
+    def warmup(cls) -> None:
+        """ One query per collection so the first request does not pay for loading HNSW indexes and model warmup """
+        query_embeddings = cls.embedder(["warmup"])
+        for name, collection in cls.collections.items():
+            try:
+                collection.query(query_embeddings=query_embeddings, n_results=1)
+            except Exception as e:
+                logging.warning(f"Warmup query on {name} failed: {e}")
+
     @classmethod
     def get_available_models(cls):
         return list(cls._models.keys())
\ No newline at end of file
@@ -1,9 +1,20 @@
+import asyncio
 from typing import List
 
 from src.db.db import get_session_context
 from src.rag.resource_pool import ResourcePool
+from src.analytics.user_context import user_context_cache
 import re
 
+# Query side instruction of the embedding model, documents are embedded without it
+QUERY_INSTRUCTION = "Instruct: Find relevant documents \n Query: "
+
+# Chunk dicts of each Chroma collection, from (document, metadata, distance)
+CHUNK_FORMATS = {
+    "yt_transcripts": lambda doc, metadata, dist: {'chunk': doc, 'title': metadata['title'], 'vid_id': metadata['vid_id'], 'distance': dist},
+    "txtbks": lambda doc, metadata, dist: {'chunk': doc, 'title': metadata['source_title'], 'header': metadata['Header_2'], 'distance': dist},
+}
+
 class Retriever():
     """ Housing class for all retrieval related operations """
 
@@ -92,10 +103,8 @@ class Retriever():
             
             async with get_session_context() as session:
                 user_info = await ResourcePool.user_service.get_user_by_id(user_uid, session)
-                # user_logs = await self.workout_logs_service.get_logs_by_user(self.user_uid, session)
-                # user_logs_json = []
-                # for log in user_logs:
-                #     user_logs_json.append(WorkoutLogResponse.model_validate(log).model_dump(mode='json'))
+                # Fixed-size summary built from aggregates, so the prompt does not grow with the history
+                workout_history = await user_context_cache.get(user_info.uid, session)
 
             user_data = {
                 "username" : user_info.username,
@@ -103,48 +112,81 @@ class Retriever():
                 "age" : user_info.age,
                 "height_raw" : user_info.height_raw,
                 "height_unit" : user_info.height_unit.value if user_info.height_unit else None,
-                # "user_workout_logs" : user_logs_json
+                "workout_history" : workout_history,
             }
             return user_data
 
     @staticmethod
-    def retrieve_embedded_chunks(queries: List[str], n_yt_res=10, n_txtbk_res=5) -> dict:
-        # Chromadb retrieval
-        collection_yt = ResourcePool.chroma_client.get_collection(name="yt_transcripts", embedding_function=ResourcePool.embedder)
-        collection_txtbk = ResourcePool.chroma_client.get_collection(name="txtbks", embedding_function=ResourcePool.embedder)
-        chunks = {'transcript_chunks': [], 'txtbk_chunks': []}
-        for query in queries:
-            yt_res = collection_yt.query(query_texts=[f"Instruct: Find relevant documents \n Query: {query}"], n_results=n_yt_res)
-            chunks['transcript_chunks'].extend(
-                [{'chunk': doc, 'title': metadata['title'], 'vid_id': metadata['vid_id'], 'distance': dist} 
-                for doc, metadata, dist in zip(yt_res['documents'][0], yt_res['metadatas'][0], yt_res['distances'][0])]
-                )
-            txtbk_res = collection_txtbk.query(query_texts=[f"Instruct: Find relevant documents \n Query: {query}"], n_results=n_txtbk_res)
-            chunks['txtbk_chunks'].extend(
-                [{'chunk': doc, 'title': metadata['source_title'], 'header': metadata['Header_2'], 'distance': dist} 
-                for doc, metadata, dist in zip(txtbk_res['documents'][0], txtbk_res['metadatas'][0], txtbk_res['distances'][0])]
-                )
-
-        return chunks
-    
+    async def embed_queries(queries: List[str], cache_fields: dict | None = None) -> list:
+        """
+        Vectors of the queries, shared by all collection queries. Cached queries skip the model, the rest are
+        encoded in one batch. The cache counters of the call are added to cache_fields (rag_profile logs).
+        """
+        if not queries:
+            return []
+        texts = [QUERY_INSTRUCTION + query for query in queries]
+        vectors, fields = await ResourcePool.query_embedding_cache.get_many(texts, Retriever._encode)
+        if cache_fields is not None:
+            cache_fields.update(fields)
+        return vectors
+
+    @staticmethod
+    async def _encode(texts: List[str]):
+        # SentenceTransformer encoding and Chroma's search are blocking, run them off the event loop
+        return await asyncio.get_running_loop().run_in_executor(ResourcePool.vector_executor, ResourcePool.embedder, texts)
+
+    @staticmethod
+    async def query_collection(name: str, query_embeddings: list, n_results: int) -> list[dict]:
+        return await asyncio.get_running_loop().run_in_executor(
+            ResourcePool.vector_executor, Retriever._query_collection, name, query_embeddings, n_results)
+
+    @staticmethod
+    async def search_papers(query: str, n_results: int = 10) -> list[dict]:
+        # The Exa client is a blocking HTTP client
+        return await asyncio.get_running_loop().run_in_executor(
+            ResourcePool.search_executor, Retriever._search_papers, query, n_results)
+
     @staticmethod
-    def retrieve_exa_papers(queries: List[str], n_results=10):
-        results = []
-        for query in queries:
-            response = ResourcePool.exa_client.search_and_contents(
+    async def retrieve_embedded_chunks(queries: List[str], n_yt_res=10, n_txtbk_res=5) -> dict:
+        query_embeddings = await Retriever.embed_queries(queries)
+        transcript_chunks, txtbk_chunks = await asyncio.gather(
+            Retriever.query_collection("yt_transcripts", query_embeddings, n_yt_res),
+            Retriever.query_collection("txtbks", query_embeddings, n_txtbk_res))
+        return {'transcript_chunks': transcript_chunks, 'txtbk_chunks': txtbk_chunks}
+
+    @staticmethod
+    async def retrieve_exa_papers(queries: List[str], n_results=10) -> list:
+        papers = await asyncio.gather(*(Retriever.search_papers(query, n_results) for query in queries))
+        return [paper for query_papers in papers for paper in query_papers]
+
+    @staticmethod
+    def _query_collection(name: str, query_embeddings: list, n_results: int) -> list[dict]:
+        """ One multi-query call, the chunks of every query in query order """
+        if len(query_embeddings) == 0:
+            return []
+        collection = ResourcePool.get_collection(name)
+        res = collection.query(query_embeddings=query_embeddings, n_results=n_results)
+
+        to_chunk = CHUNK_FORMATS[name]
+        return [to_chunk(doc, metadata, dist)
+                for docs, metadatas, dists in zip(res['documents'], res['metadatas'], res['distances'])
+                for doc, metadata, dist in zip(docs, metadatas, dists)]
+
+    @staticmethod
+    def _search_papers(query: str, n_results: int) -> list[dict]:
+        response = ResourcePool.exa_client.search_and_contents(
             query.strip(),
             type = "auto",
             category = "research paper",
             summary = True,
             num_results = n_results
-            )
-            results.extend([
-                {
-                    'title': paper.title,
-                    'url': paper.url,
-                    'published_date': paper.published_date,
-                    'summary': paper.summary
-                }
-                for paper in response.results
-            ])
-        return results
\ No newline at end of file
+        )
+        return [
+            {
+                'title': paper.title,
+                'url': paper.url,
+                'published_date': paper.published_date,
+                'summary': paper.summary
+            }
+            for paper in response.results
+        ]
@@ -7,13 +7,12 @@ from uuid import UUID
 # from sqlalchemy.ext.asyncio import AsyncSession
 # from src.db.db import get_session
 from src.rag.schemas import RAGInternalRequest, RAGRequest, RAGSingleResponse, ResearchResultFull, ResearchResultHistoryItem
-from src.auth.dependencies import AccessTokenBearer
+from src.auth.dependencies import access_token_bearer
 from src.config import Config
 from src.rag.service import ResearchService
 from src.db.db import get_session
 
 rag_router = APIRouter()
-access_token_bearer = AccessTokenBearer()
 research_service = ResearchService()
 
 @rag_router.get("/get_available_models", response_model=list[str])
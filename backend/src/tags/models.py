@@ -1,5 +1,5 @@
 from src.db.base_model import BaseModel
-from sqlalchemy import Column, String, UUID, Table, ForeignKey
+from sqlalchemy import Column, String, UUID, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 
@@ -7,8 +7,10 @@ from uuid import uuid4
 exercise_tags = Table(
     "exercise_tags",
     BaseModel.metadata,
-    Column("eid", UUID(as_uuid=True), ForeignKey("exercises.eid"), primary_key=True),
-    Column("tid", UUID(as_uuid=True), ForeignKey("tags.tid"), primary_key=True),
+    Column("eid", UUID(as_uuid=True), ForeignKey("exercises.eid", ondelete="CASCADE"), primary_key=True),
+    Column("tid", UUID(as_uuid=True), ForeignKey("tags.tid", ondelete="CASCADE"), primary_key=True),
+    # The primary key leads on eid, exercises of a tag (ON DELETE CASCADE from tags) need their own index
+    Index("ix_exercise_tags_tid", "tid"),
 )
 
 
@@ -28,7 +30,7 @@ class Tag(BaseModel):
     tag_name = Column(String, nullable=False, unique=True)
     tag_color = Column(String, nullable=False, default="#808080")
 
-    exercises = relationship("Exercise", secondary=exercise_tags, back_populates="tags")
+    exercises = relationship("Exercise", secondary=exercise_tags, back_populates="tags", passive_deletes=True)
     # workout_logs = relationship("WorkoutLog", secondary=workout_tags, back_populates="tags")
 
 
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src.auth.dependencies import RoleChecker
 from src.db.db import get_session
 from src.tags.schemas import TagBase, TagCreate
 from src.tags.service import TagService
@@ -10,7 +10,6 @@ from uuid import UUID
 
 tag_router = APIRouter()
 tag_service = TagService()
-access_token_bearer = AccessTokenBearer()
 role_checker = RoleChecker(["user", "admin"])
 
 
@@ -1,9 +1,11 @@
 from fastapi import status
 from fastapi.exceptions import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, delete, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import make_transient_to_detached
 from src.tags.models import Tag
+from src.exercise.cache import catalogue_cache
 from src.tags.schemas import TagCreate
 from uuid import UUID
 from typing import List
@@ -11,10 +13,9 @@ from typing import List
 
 class TagService:
     async def get_all_tags(self, session: AsyncSession):
-        statement = select(Tag).order_by(Tag.tag_name.desc())
-        res = await session.execute(statement)
+        catalogue = await catalogue_cache.get()
 
-        return res.scalars().all()
+        return catalogue.tags
 
     async def get_tag_by_id(self, tag_id: UUID, session: AsyncSession):
         statement = select(Tag).where(Tag.tid == tag_id)
@@ -34,6 +35,7 @@ class TagService:
 
         session.add(new_tag)
         await session.commit()
+        await catalogue_cache.invalidate()
         await session.refresh(new_tag)
 
         return new_tag
@@ -46,41 +48,51 @@ class TagService:
             setattr(tag, k, v)
         
         await session.commit()
+        await catalogue_cache.invalidate()
         await session.refresh(tag)
 
         return tag
 
     async def delete_tag(self, tag_id: UUID, session: AsyncSession):
-        statement = select(Tag).options(selectinload(Tag.exercises))\
-        .where(Tag.tid == tag_id)
+        # exercise_tags rows go with it through ON DELETE CASCADE
+        statement = delete(Tag).where(Tag.tid == tag_id).returning(Tag.tid)
         res = await session.execute(statement)
-        tag = res.scalar_one_or_none()
-        
-        if not tag:
+        if res.scalar_one_or_none() is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                     detail="Tag not found.")
-    
-        tag.exercises.clear()
-        await session.flush()
 
-        await session.delete(tag)
         await session.commit()
+        await catalogue_cache.invalidate()
         return
-        # statement = delete(Tag).where(Tag.tid == tag_id)
-        # await session.execute(statement)
-        # await session.commit()
-        # return
+
+    @staticmethod
+    async def resolve_tag_slugs(tag_slugs: List[str], session: AsyncSession) -> dict[str, dict]:
+        """ Returns {tag_slug: tag columns} for every slug, one 404 names all slugs that do not exist """
+        catalogue = await catalogue_cache.get()
+        tags = {slug: catalogue.tags_by_tid[catalogue.tids_by_name[slug]]
+                for slug in tag_slugs if slug in catalogue.tids_by_name}
+
+        # Not in the catalogue yet (e.g. created by another worker since it was loaded), one query for all of them
+        uncached = [slug for slug in dict.fromkeys(tag_slugs) if slug not in tags]
+        if uncached:
+            statement = select(Tag.tid, Tag.tag_name, Tag.tag_color)\
+                .where(Tag.tag_name == any_(bindparam("tag_slugs", uncached, type_=ARRAY(String))))
+            res = await session.execute(statement)
+            tags.update({row.tag_name: row._asdict() for row in res})
+
+        missing = [slug for slug in uncached if slug not in tags]
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"Tag does not exist: {', '.join(missing)}")
+        return tags
 
     @classmethod
     async def get_tags_from_slugs(cls, tag_slugs: List[str], session: AsyncSession) -> List[Tag]:
-        tag_service = cls()
+        resolved = await cls.resolve_tag_slugs(tag_slugs, session)
         tags = []
-        for tag_slug in tag_slugs:
-            tag = await tag_service.get_tag_by_slug(tag_slug, session)
-
-            if not tag:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, 
-                                    detail="Tag does not exist.")
-            tags.append(tag)
+        for tag_slug in dict.fromkeys(tag_slugs):
+            # Attach the resolved row to this session without another SELECT
+            tag = Tag(**resolved[tag_slug])
+            make_transient_to_detached(tag)
+            tags.append(await session.merge(tag, load=False))
         return tags
-        
\ No newline at end of file
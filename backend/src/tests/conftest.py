@@ -45,6 +45,23 @@ async def temp_client(temp_app):
     async with AsyncClient(transport=transport, base_url="http://localhost") as ac:
         yield ac
 
+@pytest_asyncio.fixture()
+async def shared_session_client(temp_app):
+    # Every request shares one session whose transaction is rolled back at the end of the test, so writes
+    # made by one request are visible to the next
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        async with Session(bind=conn) as session:
+            async def get_shared_session() -> AsyncGenerator[AsyncSession, None]:
+                yield session
+
+            temp_app.dependency_overrides[get_session] = get_shared_session
+            transport = ASGITransport(app=temp_app)
+            async with AsyncClient(transport=transport, base_url="http://localhost") as ac:
+                yield ac
+        await trans.rollback()
+    temp_app.dependency_overrides[get_session] = get_test_session
+
 @pytest_asyncio.fixture
 async def test_user_login(temp_client: AsyncClient):
     response = await temp_client.post("/v1/user/login",
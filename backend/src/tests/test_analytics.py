@@ -0,0 +1,149 @@
+import pytest
+import numpy as np
+from httpx import AsyncClient
+from datetime import date
+from uuid import uuid4
+from src.db.db import Session, async_engine
+from src.auth.service import UserService
+from src.workout_logs.service import WorkoutLogService
+from src.workout_logs.schemas import WorkoutLogCreate
+from src.analytics.training_load import LogArrays, estimate_1rm, best_e1rm_by_day, training_load, to_day
+from src.analytics.user_context import UserContextCache, fit_to_budget, estimate_tokens, dump_context
+from src.tests.conftest import SEED_USER
+
+
+@pytest.mark.asyncio
+async def test_get_weekly_volume(temp_client: AsyncClient, test_user_login):
+    access_token = test_user_login["access_token"]
+
+    for group_by in ("exercise", "tag"):
+        res = await temp_client.get("/v1/analytics/weekly",
+                                    params={"group_by" : group_by, "start" : "2000-01-01"},
+                                    headers={"Authorization" : f"Bearer {access_token}"})
+        assert res.status_code == 200
+        for series in res.json()["series"]:
+            columns = ("week", "sets", "reps", "volume", "top_weight", "top_reps")
+            assert len({len(series[column]) for column in columns}) == 1
+
+@pytest.mark.asyncio
+async def test_weekly_volume_values(test_user_login, shared_session_client: AsyncClient):
+    access_token = test_user_login["access_token"]
+    headers = {"Authorization" : f"Bearer {access_token}"}
+
+    # Monday and Wednesday of one week, then the following Monday
+    sets = [{"exercise_slug" : "bb-bench-press", "reps" : 5, "weight" : 100, "date_performed" : "2024-01-01"},
+            {"exercise_slug" : "bb-bench-press", "reps" : 8, "weight" : 100, "date_performed" : "2024-01-03"},
+            {"exercise_slug" : "bb-bench-press", "reps" : 3, "weight" : 120, "date_performed" : "2024-01-03"},
+            {"exercise_slug" : "bb-bench-press", "reps" : 5, "weight" : 110, "date_performed" : "2024-01-08"}]
+    res = await shared_session_client.post("/v1/workout_log/bulk", json={"logs" : sets, "batch_id" : str(uuid4())}, headers=headers)
+    assert res.status_code == 201
+
+    res = await shared_session_client.get("/v1/analytics/weekly",
+                                params={"start" : "2024-01-01", "end" : "2024-01-14"}, headers=headers)
+    assert res.status_code == 200
+    series = {s["key"] : s for s in res.json()["series"]}["bb-bench-press"]
+    assert series["week"] == ["2024-01-01", "2024-01-08"]
+    assert series["sets"] == [3, 1]
+    assert series["volume"] == [5 * 100 + 8 * 100 + 3 * 120, 5 * 110]
+    assert series["top_weight"] == [120, 110]
+    assert series["top_reps"] == [3, 5]
+
+@pytest.mark.asyncio
+async def test_weekly_volume_invalid_range(temp_client: AsyncClient, test_user_login):
+    access_token = test_user_login["access_token"]
+
+    res = await temp_client.get("/v1/analytics/weekly",
+                                params={"start" : "2025-02-01", "end" : "2025-01-01"},
+                                headers={"Authorization" : f"Bearer {access_token}"})
+    assert res.status_code == 400
+
+def test_estimate_1rm_formulas():
+    weight = np.array([100.0, 100.0, 100.0])
+    reps = np.array([1, 10, 40])
+
+    assert estimate_1rm(weight, reps, "epley")[:2] == pytest.approx([100, 100 * (1 + 10 / 30)])
+    brzycki = estimate_1rm(weight, reps, "brzycki")
+    assert brzycki[:2] == pytest.approx([100, 100 * 36 / 27])
+    # Past its asymptote the formula is undefined
+    assert np.isnan(brzycki[2])
+
+def test_training_load_acwr():
+    start = to_day(date(2024, 1, 1))
+    # 100 volume every day for 4 weeks, then a week at 200
+    rows = [(start + day, 1, 100 if day < 28 else 200) for day in range(35)]
+    logs = LogArrays.from_rows(rows)
+    load = training_load(logs.days, logs.volume, start + 27, start + 34)
+
+    assert load["acwr"][0] == pytest.approx(1.0)
+    assert load["acute"][-1] == pytest.approx(200)
+    assert load["chronic"][-1] == pytest.approx((21 * 100 + 7 * 200) / 28)
+    assert load["acwr"][-1] == pytest.approx(200 / 125)
+
+def test_best_e1rm_by_day():
+    day = to_day(date(2024, 1, 1))
+    logs = LogArrays.from_rows([(day + 1, 5, 100), (day, 1, 90), (day + 1, 1, 110)])
+    result = best_e1rm_by_day(logs, ["epley"])
+
+    assert result["days"].tolist() == [day, day + 1]
+    assert result["epley"] == pytest.approx([90, 100 * (1 + 5 / 30)])
+
+@pytest.mark.asyncio
+async def test_get_e1rm_and_training_load(temp_client: AsyncClient, test_user_login):
+    headers = {"Authorization" : f"Bearer {test_user_login['access_token']}"}
+
+    res = await temp_client.get("/v1/analytics/e1rm",
+                                params={"exercise_slug" : "bb-bench-press", "formula" : ["epley", "brzycki"]},
+                                headers=headers)
+    assert res.status_code == 200
+    assert set(res.json()["e1rm"]) == {"epley", "brzycki"}
+    assert all(len(values) == len(res.json()["day"]) for values in res.json()["e1rm"].values())
+
+    res = await temp_client.get("/v1/analytics/e1rm",
+                                params={"exercise_slug" : "bb-bench-press", "formula" : "not-a-formula"},
+                                headers=headers)
+    assert res.status_code == 400
+
+    res = await temp_client.get("/v1/analytics/training_load",
+                                params={"start" : "2025-01-01", "end" : "2025-01-31"}, headers=headers)
+    assert res.status_code == 200
+    assert len(res.json()["day"]) == len(res.json()["acwr"]) == 31
+
+
+def test_user_context_fits_budget():
+    summary = {
+        "as_of" : "2024-01-01",
+        "training_load" : {},
+        "recent_top_sets" : [{"day" : "2024-01-01", "exercise" : f"exercise {i}", "top_weight" : 100} for i in range(50)],
+        "personal_records" : [{"exercise" : f"exercise {i}", "max_weight" : 100} for i in range(10)],
+        "weekly_volume_by_tag" : {"first_week" : "2023-11-13", "tags" : {f"tag {i}" : [1000] * 8 for i in range(6)}},
+    }
+    summary = fit_to_budget(summary, 300)
+
+    assert estimate_tokens(dump_context(summary)) <= 300
+    # The longest list is trimmed first, from its least relevant end
+    assert len(summary["recent_top_sets"]) <= len(summary["personal_records"]) + 1
+    assert summary["recent_top_sets"][0]["exercise"] == "exercise 0"
+    assert list(summary["weekly_volume_by_tag"]["tags"])[0] == "tag 0"
+
+@pytest.mark.asyncio
+async def test_user_context_follows_log_writes():
+    cache = UserContextCache(token_budget=600, ttl_seconds=60)
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        async with Session(bind=conn) as session:
+            user = await UserService().get_user_by_email(SEED_USER["email"], session)
+            context = await cache.get(user.uid, session)
+            assert await cache.get(user.uid, session) == context
+            assert (cache.hits, cache.builds) == (1, 1)
+
+            log = WorkoutLogCreate(exercise_slug="bb-bench-press", reps=1, weight=1000, date_performed=date.today())
+            await WorkoutLogService().create_log(log, user.uid, session)
+            context = await cache.get(user.uid, session)
+            assert cache.builds == 2
+            assert context["recent_top_sets"][0]["top_weight"] == 1000
+            assert context["personal_records"][0]["max_weight"] == 1000
+        await trans.rollback()
+
+    # The write was rolled back, do not leave its summary behind
+    await cache.invalidate(user.uid)
+    assert estimate_tokens(dump_context(context)) <= 600
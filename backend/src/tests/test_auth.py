@@ -1,8 +1,23 @@
+import asyncio
+import multiprocessing
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
-from src.tests.conftest import SEED_USER
-from datetime import datetime
+from sqlalchemy import event
+from src.tests.conftest import SEED_USER, SEED_EXERCISES
+from src.db.db import Session, async_engine
+import src.auth.dependencies as auth_dependencies
+from src.auth.dependencies import get_current_user
+from src.auth.service import UserService
+from src.auth.cache import principal_cache
+from src.auth.utils import decode_validate_jwt, generate_pwd_hash_async, verify_pwd_async, pwd_hash_pool
+from src.db.redis_cache import BlocklistMirror, add_jti_to_blocklist, blocklist_mirror, token_in_blocklist, \
+    redis_client, USER_INVALIDATION_CHANNEL
+from src.exercise.service import ExerciseService
+from src.workout_logs.models import WorkoutLog
+from datetime import datetime, date, timedelta
+from time import time
+from uuid import uuid4
 
 @pytest.mark.asyncio
 async def test_user_signup(temp_client: AsyncClient):
@@ -44,6 +59,129 @@ async def test_get_current_user(temp_client: AsyncClient, test_user_login):
     response = await temp_client.get("v1/user/me", headers={"Authorization" : f"Bearer {access_token}"})
     assert response.status_code == 200
 
+@pytest.mark.asyncio
+async def test_principal_cache_hit_on_repeat_request(temp_client: AsyncClient, test_user_login):
+    access_token = test_user_login["access_token"]
+
+    response = await temp_client.get("v1/user/me", headers={"Authorization" : f"Bearer {access_token}"})
+    assert response.status_code == 200
+    user_hits, payload_hits = principal_cache.user_hits, principal_cache.payload_hits
+
+    response = await temp_client.get("v1/user/me", headers={"Authorization" : f"Bearer {access_token}"})
+    assert response.status_code == 200
+    assert principal_cache.user_hits > user_hits
+    assert principal_cache.payload_hits > payload_hits
+
+@pytest.mark.asyncio
+async def test_principal_cache_invalidated_on_revoke(temp_client: AsyncClient, test_user_login):
+    access_token = test_user_login["access_token"]
+
+    response = await temp_client.get("v1/user/me", headers={"Authorization" : f"Bearer {access_token}"})
+    assert response.status_code == 200
+
+    await add_jti_to_blocklist(decode_validate_jwt(access_token)["jti"])
+    response = await temp_client.get("v1/user/me", headers={"Authorization" : f"Bearer {access_token}"})
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_token_verified_once_per_request(temp_client: AsyncClient, test_user_login, monkeypatch):
+    access_token = test_user_login["access_token"]
+    decoded_tokens = []
+
+    def counting_decode(token: str):
+        decoded_tokens.append(token)
+        return decode_validate_jwt(token)
+
+    # Route depends on both RoleChecker (via get_current_user) and the access token bearer
+    monkeypatch.setattr(auth_dependencies, "decode_validate_jwt", counting_decode)
+    response = await temp_client.get("/v1/exercise/all", headers={"Authorization" : f"Bearer {access_token}"})
+    assert response.status_code == 200
+    assert len(decoded_tokens) == 1
+
+def _blocklist_worker_process(conn):
+    # Simulates another API worker: its own process, its own blocklist mirror
+    async def run():
+        await blocklist_mirror.start()
+        jti = await asyncio.to_thread(conn.recv)
+        conn.send((blocklist_mirror.synced, await token_in_blocklist(jti)))
+
+        _ = await asyncio.to_thread(conn.recv) # revoked by the other process
+        revoked = False
+        for _ in range(200):
+            revoked = await token_in_blocklist(jti)
+            if revoked:
+                break
+            await asyncio.sleep(0.01)
+        conn.send((revoked, blocklist_mirror.remote_checks))
+        await blocklist_mirror.stop()
+
+    asyncio.run(run())
+
+@pytest.mark.asyncio
+async def test_revoked_token_rejected_on_other_worker_process(test_user_login):
+    jti = decode_validate_jwt(test_user_login["access_token"])["jti"]
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    worker = multiprocessing.get_context("spawn").Process(target=_blocklist_worker_process, args=(child_conn,))
+    worker.start()
+    try:
+        parent_conn.send(jti)
+        synced, revoked_before = await asyncio.to_thread(parent_conn.recv)
+        assert synced
+        assert not revoked_before
+
+        await add_jti_to_blocklist(jti)
+        parent_conn.send("revoked")
+        revoked_after, remote_checks = await asyncio.to_thread(parent_conn.recv)
+        assert revoked_after
+        assert remote_checks == 0 # answered from the local mirror
+    finally:
+        worker.join(timeout=10)
+
+@pytest.mark.asyncio
+async def test_blocklist_mirror_answers_locally():
+    await blocklist_mirror.start()
+    try:
+        remote_checks = blocklist_mirror.remote_checks
+        revoked_jti, live_jti = str(uuid4()), str(uuid4())
+        await add_jti_to_blocklist(revoked_jti)
+
+        assert await token_in_blocklist(revoked_jti)
+        assert not await token_in_blocklist(live_jti)
+        assert blocklist_mirror.remote_checks == remote_checks
+    finally:
+        await blocklist_mirror.stop()
+
+@pytest.mark.asyncio
+async def test_user_change_in_other_worker_drops_cached_principal():
+    await blocklist_mirror.start()
+    try:
+        uid, jti = str(uuid4()), str(uuid4())
+        principal_cache.put_payload(jti, {"jti" : jti, "user" : {"uid" : uid}})
+        assert principal_cache.get_payload(jti)
+
+        # Another worker updated or deleted the user
+        await redis_client.publish(USER_INVALIDATION_CHANNEL, uid)
+        for _ in range(100):
+            if not principal_cache.get_payload(jti):
+                break
+            await asyncio.sleep(0.01)
+        assert not principal_cache.get_payload(jti)
+    finally:
+        await blocklist_mirror.stop()
+
+def test_blocklist_mirror_evicts_expired_jtis():
+    mirror = BlocklistMirror()
+    expired_jtis = [str(uuid4()) for _ in range(100)]
+    for jti in expired_jtis:
+        mirror.add(jti, expires_at=time() - 1)
+    live_jti = str(uuid4())
+    mirror.add(live_jti)
+
+    # Never looked up, the expired JTIs are still dropped
+    assert mirror.stats()["size"] == 1
+    assert mirror.contains(live_jti)
+
 @pytest.mark.asyncio
 async def test_user_delete(temp_client: AsyncClient, test_user_login):
     access_token = test_user_login["access_token"]
@@ -53,3 +191,57 @@ async def test_user_delete(temp_client: AsyncClient, test_user_login):
                                  headers = {"Authorization" : f"Bearer {access_token}"})
     assert response.status_code == 200
 
+
+@pytest.mark.asyncio
+async def test_pwd_hashing_does_not_block_event_loop():
+    ticks = 0
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.001)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    completed = pwd_hash_pool.completed
+    pwd_hash = await generate_pwd_hash_async(SEED_USER["password"])
+    is_valid = await verify_pwd_async(SEED_USER["password"], pwd_hash)
+    ticker_task.cancel()
+
+    assert is_valid
+    assert ticks > 0
+    assert pwd_hash_pool.completed == completed + 2
+    assert pwd_hash_pool.queue_depth == 0
+
+@pytest.mark.asyncio
+async def test_current_user_rows_flat_with_log_history():
+    # Regression benchmark: rows loaded to resolve the auth principal must not grow with log history
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        async with Session(bind=conn) as session:
+            user = await UserService().get_user_by_email(SEED_USER["email"], session)
+            eid = await ExerciseService.get_eid_from_slug(SEED_EXERCISES[0]["exercise_slug"], session)
+            payload = {"user": {"email": user.email, "uid": str(user.uid)}, "jti": str(uuid4())}
+
+            loaded_rows = []
+            event.listen(session.sync_session, "loaded_as_persistent", lambda s, obj: loaded_rows.append(obj))
+
+            rows_per_request = {}
+            base_time = datetime(2000, 1, 1)
+            n_logs = 0
+            for history_size in (0, 100, 1000):
+                session.add_all([
+                    WorkoutLog(user_uid=user.uid, exercise_eid=eid, reps=5, weight=100,
+                               date_performed=date(2000, 1, 1) + timedelta(days=i),
+                               created_at=base_time + timedelta(seconds=i))
+                    for i in range(n_logs, history_size)
+                ])
+                n_logs = history_size
+                await session.flush()
+                session.expunge_all()
+
+                loaded_rows.clear()
+                _ = await get_current_user(payload=payload, session=session)
+                rows_per_request[history_size] = len(loaded_rows)
+        await trans.rollback()
+
+    assert set(rows_per_request.values()) == {1}, rows_per_request
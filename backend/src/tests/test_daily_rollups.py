@@ -0,0 +1,58 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from uuid import uuid4
+from src.db.db import Session, async_engine
+from src.auth.service import UserService
+from src.daily_rollups.models import WorkoutDailyRollup
+from src.daily_rollups.service import DailyRollupService
+from src.tests.conftest import SEED_USER
+
+
+@pytest.mark.asyncio
+async def test_rollup_follows_log_writes(test_user_login, shared_session_client: AsyncClient):
+    headers = {"Authorization" : f"Bearer {test_user_login['access_token']}"}
+
+    async def weekly(exercise_slug):
+        res = await shared_session_client.get("/v1/analytics/weekly",
+                                    params={"start" : "2023-03-06", "end" : "2023-03-12"}, headers=headers)
+        assert res.status_code == 200
+        return {s["key"] : s for s in res.json()["series"]}.get(exercise_slug)
+
+    sets = [{"exercise_slug" : "bb-bench-press", "reps" : 5, "weight" : 100, "date_performed" : "2023-03-06"},
+            {"exercise_slug" : "bb-bench-press", "reps" : 3, "weight" : 120, "date_performed" : "2023-03-06"}]
+    res = await shared_session_client.post("/v1/workout_log/bulk", json={"logs" : sets, "batch_id" : str(uuid4())}, headers=headers)
+    assert res.status_code == 201
+    heavy_wid = [log["wid"] for log in res.json()["created"] if log["weight"] == 120][0]
+
+    series = await weekly("bb-bench-press")
+    assert series["sets"] == [2]
+    assert series["volume"] == [5 * 100 + 3 * 120]
+    assert series["top_weight"] == [120]
+
+    # Removing the top set recomputes that day's maximum
+    res = await shared_session_client.delete(f"/v1/workout_log/{heavy_wid}", headers=headers)
+    assert res.status_code == 204
+    series = await weekly("bb-bench-press")
+    assert series["sets"] == [1]
+    assert series["top_weight"] == [100]
+
+    res = await shared_session_client.delete("/v1/workout_log/day/2023-03-06", headers=headers)
+    assert res.status_code == 204
+    assert await weekly("bb-bench-press") is None
+
+@pytest.mark.asyncio
+async def test_rollup_rebuild_matches_incremental():
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        async with Session(bind=conn) as session:
+            user = await UserService().get_user_by_email(SEED_USER["email"], session)
+            statement = select(WorkoutDailyRollup.__table__).where(WorkoutDailyRollup.user_uid == user.uid)\
+                .order_by(WorkoutDailyRollup.exercise_eid, WorkoutDailyRollup.day)
+
+            incremental = (await session.execute(statement)).all()
+            await DailyRollupService().rebuild(session, user.uid)
+            rebuilt = (await session.execute(statement)).all()
+        await trans.rollback()
+
+    assert rebuilt == incremental
@@ -1,7 +1,15 @@
 import pytest
 import pytest_asyncio
-from src.tests.conftest import SEED_EXERCISES, SEED_TAGS
+from src.tests.conftest import SEED_EXERCISES, SEED_TAGS, SEED_USER
 from httpx import AsyncClient
+from sqlalchemy import event
+from src.db.db import Session, async_engine
+from src.auth.service import UserService
+from src.exercise.service import ExerciseService
+from src.exercise.cache import CatalogueCache, CATALOGUE_VERSION_KEY
+from src.db.redis_cache import redis_client
+from src.workout_logs.models import WorkoutLog
+from datetime import datetime, date, timedelta
 
 @pytest.mark.asyncio
 async def test_get_exercise_by_slug(temp_client: AsyncClient, test_user_login):
@@ -33,6 +41,30 @@ async def test_create_exercise(temp_client: AsyncClient, test_user_login):
                                  headers={"Authorization" : f"Bearer {access_token}"})
     assert res.status_code == 201
 
+@pytest.mark.asyncio
+async def test_create_exercises_bulk(temp_client: AsyncClient, test_user_login):
+    access_token = test_user_login["access_token"]
+    headers = {"Authorization" : f"Bearer {access_token}"}
+
+    exercises = [{"exercise_slug" : "db-row", "exercise_name" : "Dumbell Row", "tag_slugs" : ["Pull", "Pull"]},
+                 {"exercise_slug" : "db-fly", "exercise_name" : "Dumbell Fly", "tag_slugs" : ["Push"]}]
+    res = await temp_client.post("/v1/exercise/bulk", json={"exercises" : exercises}, headers=headers)
+    assert res.status_code == 201
+    assert [ex["exercise_slug"] for ex in res.json()] == ["db-row", "db-fly"]
+    assert [tag["tag_name"] for tag in res.json()[0]["tags"]] == ["Pull"]
+
+    # Every unknown tag is reported at once and nothing is created
+    exercises[1]["tag_slugs"] = ["not-a-tag", "also-not-a-tag"]
+    res = await temp_client.post("/v1/exercise/bulk", json={"exercises" : exercises}, headers=headers)
+    assert res.status_code == 404
+    assert "not-a-tag" in res.json()["detail"] and "also-not-a-tag" in res.json()["detail"]
+
+    res = await temp_client.post("/v1/exercise/bulk",
+                                 json={"exercises" : [{"exercise_slug" : SEED_EXERCISES[0]["exercise_slug"],
+                                                       "exercise_name" : "Duplicate", "tag_slugs" : []}]},
+                                 headers=headers)
+    assert res.status_code == 409
+
 @pytest.mark.asyncio
 async def test_update_exercise(temp_client: AsyncClient, test_user_login):
     access_token = test_user_login["access_token"]
@@ -68,3 +100,49 @@ async def test_get_exercises_by_tag_id(temp_client: AsyncClient, test_user_login
     res = await temp_client.get(f"/v1/exercise/tag/?tid={tid}",
                                 headers={"Authorization" : f"Bearer {access_token}"})
     assert res.status_code == 200
+
+@pytest.mark.asyncio
+async def test_exercise_reads_do_not_load_logs():
+    # Exercise reads must not hydrate the workout logs of that exercise, however many exist
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        async with Session(bind=conn) as session:
+            user = await UserService().get_user_by_email(SEED_USER["email"], session)
+            exercise_slug = SEED_EXERCISES[0]["exercise_slug"]
+            eid = await ExerciseService.get_eid_from_slug(exercise_slug, session)
+            session.add_all([
+                WorkoutLog(user_uid=user.uid, exercise_eid=eid, reps=5, weight=100, date_performed=date(2000, 1, 1),
+                           created_at=datetime(2000, 1, 1) + timedelta(seconds=i))
+                for i in range(100)
+            ])
+            await session.flush()
+            session.expunge_all()
+
+            loaded_logs = []
+            event.listen(session.sync_session, "loaded_as_persistent",
+                         lambda s, obj: loaded_logs.append(obj) if isinstance(obj, WorkoutLog) else None)
+            _ = await ExerciseService().get_exercise_by_slug(exercise_slug, session)
+            _ = await ExerciseService().get_all_exercises(session)
+            assert await ExerciseService.get_eid_from_slug(exercise_slug, session) == eid
+        await trans.rollback()
+
+    assert loaded_logs == []
+
+@pytest.mark.asyncio
+async def test_catalogue_cache_follows_version():
+    cache = CatalogueCache(version_check_seconds=0)
+    async with Session() as session:
+        snapshot = await cache.get()
+        assert await cache.get() is snapshot
+        assert snapshot.eids_by_slug[SEED_EXERCISES[0]["exercise_slug"]] == \
+            await ExerciseService.get_eid_from_slug(SEED_EXERCISES[0]["exercise_slug"], session)
+
+        # A mutation in another worker bumps the shared version
+        await redis_client.incr(CATALOGUE_VERSION_KEY)
+        reloaded = await cache.get()
+        assert reloaded is not snapshot
+        assert reloaded.eids_by_slug == snapshot.eids_by_slug
+
+    assert cache.hits == 1
+    assert cache.loads == 2
+
@@ -0,0 +1,185 @@
+import pytest
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from uuid import uuid4
+
+pytest.importorskip("chromadb", reason="ML service dependencies (requirements_ml.txt) not installed")
+from src.rag.rag_service import RAGService
+from src.rag.resource_pool import ResourcePool
+from src.rag.embedding_cache import QueryEmbeddingCache
+from src.config import Config
+
+N_REQUESTS = 4
+EMBED_S = 0.05 # per encoding pass
+VECTOR_QUERY_S = 0.1 # per collection query
+PAPER_SEARCH_S = 0.3
+
+
+class FakeLLM:
+    async def ainvoke(self, prompt, **kwargs):
+        return SimpleNamespace(content="<RESEARCH QUERY> protein intake\n<EMBEDDING QUERY> optimal amount of required protein")
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, input):
+        time.sleep(EMBED_S)
+        self.calls += 1
+        return [[0.0] * 4 for _ in input]
+
+class FakeCollection:
+    def __init__(self):
+        self.query_sizes = []
+
+    def query(self, query_embeddings, n_results, **kwargs):
+        time.sleep(VECTOR_QUERY_S)
+        self.query_sizes.append(len(query_embeddings))
+        metadata = {"title": "", "vid_id": "", "source_title": "", "Header_2": ""}
+        return {"documents": [["chunk"]] * len(query_embeddings),
+                "metadatas": [[metadata]] * len(query_embeddings),
+                "distances": [[0.5]] * len(query_embeddings)}
+
+class FakeChromaClient:
+    def __init__(self):
+        self.collections = {"yt_transcripts": FakeCollection(), "txtbks": FakeCollection()}
+        self.lookups = 0
+
+    def get_collection(self, name, embedding_function=None):
+        self.lookups += 1
+        return self.collections[name]
+
+class FakeExa:
+    def search_and_contents(self, query, **kwargs):
+        time.sleep(PAPER_SEARCH_S)
+        paper = SimpleNamespace(title=query, url="https://example.org", published_date=None, summary="")
+        return SimpleNamespace(results=[paper])
+
+
+@pytest.fixture()
+def fake_resources(monkeypatch):
+    # Blocking fakes standing in for the embedding model, Chroma and Exa
+    vector_executor = ThreadPoolExecutor(max_workers=2)
+    search_executor = ThreadPoolExecutor(max_workers=8)
+    monkeypatch.setattr(ResourcePool, "_models", {"fake": FakeLLM()})
+    monkeypatch.setattr(ResourcePool, "embedder", FakeEmbedder())
+    monkeypatch.setattr(ResourcePool, "query_embedding_cache", QueryEmbeddingCache("fake", 128, redis_ttl_seconds=0))
+    monkeypatch.setattr(ResourcePool, "chroma_client", FakeChromaClient())
+    monkeypatch.setattr(ResourcePool, "collections", {})
+    monkeypatch.setattr(ResourcePool, "exa_client", FakeExa())
+    monkeypatch.setattr(ResourcePool, "vector_executor", vector_executor)
+    monkeypatch.setattr(ResourcePool, "search_executor", search_executor)
+    yield
+    vector_executor.shutdown()
+    search_executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_parallel_research_requests_overlap(fake_resources):
+    rag_service = RAGService()
+    gaps = []
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    beat = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    results = await asyncio.gather(*(rag_service.generate_research(str(uuid4()), "how much protein do I need?", "fake")
+                                     for _ in range(N_REQUESTS)))
+    elapsed = time.perf_counter() - start
+    beat.cancel()
+
+    assert len(results) == N_REQUESTS
+    serial = N_REQUESTS * (EMBED_S + 2 * VECTOR_QUERY_S + PAPER_SEARCH_S)
+    assert elapsed < serial / 2
+    # The event loop kept serving other work while retrieval ran
+    assert max(gaps) < 0.05
+
+@pytest.mark.asyncio
+async def test_retrieval_legs_run_concurrently(fake_resources):
+    start = time.perf_counter()
+    chunks, papers = await RAGService().retrieve_all(["protein intake"], ["protein", "protein timing"], "req")
+    elapsed = time.perf_counter() - start
+
+    assert len(papers) == 2
+    # Slowest leg rather than the sum of the legs
+    assert elapsed < PAPER_SEARCH_S + VECTOR_QUERY_S
+
+@pytest.mark.asyncio
+async def test_retrieval_leg_timeout_keeps_partial_results(fake_resources, monkeypatch):
+    monkeypatch.setattr(Config, "RAG_SEARCH_TIMEOUT_SECONDS", PAPER_SEARCH_S / 3)
+
+    start = time.perf_counter()
+    chunks, papers = await RAGService().retrieve_all(["protein intake"], ["protein"], "req")
+
+    assert time.perf_counter() - start < PAPER_SEARCH_S
+    assert papers == []
+    assert set(chunks) == {"transcript_chunks", "txtbk_chunks"}
+
+@pytest.mark.asyncio
+async def test_vector_timeout_covers_embed_and_queries(fake_resources, monkeypatch):
+    # Enough time for the embedding pass, not for the collection queries after it
+    monkeypatch.setattr(Config, "RAG_VECTOR_TIMEOUT_SECONDS", EMBED_S + VECTOR_QUERY_S / 2)
+
+    start = time.perf_counter()
+    chunks, _ = await RAGService().retrieve_all(["protein intake"], [], "req")
+
+    assert time.perf_counter() - start < EMBED_S + VECTOR_QUERY_S
+    assert chunks == {"transcript_chunks": [], "txtbk_chunks": []}
+
+@pytest.mark.asyncio
+async def test_queries_are_embedded_once(fake_resources):
+    queries = ["protein intake", "protein timing", "protein sources"]
+    chunks, _ = await RAGService().retrieve_all(queries, [], "req")
+
+    # One encoding pass shared by both collections, one multi-query call per collection
+    assert ResourcePool.embedder.calls == 1
+    assert [c.query_sizes for c in ResourcePool.chroma_client.collections.values()] == [[3], [3]]
+    assert len(chunks["transcript_chunks"]) == len(chunks["txtbk_chunks"]) == 3
+
+@pytest.mark.asyncio
+async def test_repeated_queries_skip_the_embedder(fake_resources):
+    rag_service = RAGService()
+    await rag_service.retrieve_all(["protein intake", "protein timing"], [], "req")
+    await rag_service.retrieve_all(["protein timing", "protein sources"], [], "req")
+
+    # Only "protein sources" was encoded by the second request
+    assert ResourcePool.embedder.calls == 2
+    assert ResourcePool.query_embedding_cache.local_hits == 1
+    assert ResourcePool.query_embedding_cache.misses == 3
+
+@pytest.mark.asyncio
+async def test_query_embedding_cache_is_bounded():
+    encoded = []
+    async def encode(texts):
+        encoded.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+    cache = QueryEmbeddingCache("fake", max_size=2, redis_ttl_seconds=0)
+    vectors, fields = await cache.get_many(["a", "bb", "a"], encode)
+    assert vectors.tolist() == [[1.0], [2.0], [1.0]]
+    assert encoded == ["a", "bb"]
+
+    # "ccc" evicts the least recently used "a"
+    await cache.get_many(["bb", "ccc"], encode)
+    await cache.get_many(["a"], encode)
+    assert encoded == ["a", "bb", "ccc", "a"]
+    assert cache.evictions == 2
+
+@pytest.mark.asyncio
+async def test_collection_handles_are_resolved_once(fake_resources):
+    rag_service = RAGService()
+    for query in ("protein intake", "protein timing", "protein sources"):
+        await rag_service.retrieve_all([query], [], "req")
+
+    # The first query resolved every collection, later ones reuse the handles
+    assert ResourcePool.chroma_client.lookups == len(ResourcePool.COLLECTION_NAMES)
+
+    ResourcePool.warmup()
+    assert [c.query_sizes[-1] for c in ResourcePool.chroma_client.collections.values()] == [1, 1]
@@ -1,7 +1,15 @@
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
-from datetime import datetime
+from datetime import datetime, date
+from uuid import uuid4
+from sqlalchemy import event, text
+import json
+import os
+from dataclasses import replace
+from src.db.db import Session, async_engine
+from src.workout_logs.service import WorkoutLogService
+from src.exercise.cache import catalogue_cache
 from src.tests.conftest import SEED_WORKOUT_LOGS
 
 # TBD Missing test_get_by_id because awkward to access ID
@@ -104,4 +112,269 @@ async def test_get_pr_log(temp_client: AsyncClient, test_user_login):
 
     res = await temp_client.get(f"/v1/workout_log/pr/?exercise_slug={test_exercise_slug}",
                                 headers={"Authorization" : f"Bearer {access_token}"})
-    assert res.status_code == 200
\ No newline at end of file
+    assert res.status_code == 200
+
+@pytest.mark.asyncio
+async def test_get_logs_by_user_paginated(test_user_login, shared_session_client: AsyncClient):
+    access_token = test_user_login["access_token"]
+    headers = {"Authorization" : f"Bearer {access_token}"}
+
+    # Several sets of the same exercise on the same day so pages split on the wid tiebreaker
+    for i in range(5):
+        res = await shared_session_client.post("/v1/workout_log/",
+                                     json={
+                                         "exercise_slug" : "bb-bench-press",
+                                         "reps" : 5,
+                                         "weight" : 200 + i,
+                                         "date_performed" : "2025-06-01",
+                                     },
+                                     headers=headers)
+        assert res.status_code == 201
+
+    # Without limit or cursor the whole history is returned in one response
+    res = await shared_session_client.get("/v1/workout_log/user_logs", headers=headers)
+    assert res.status_code == 200
+    assert "x-next-cursor" not in res.headers
+    all_wids = [log["wid"] for log in res.json()]
+
+    paged_wids = []
+    cursor = None
+    while True:
+        params = {"limit" : 2} | ({"cursor" : cursor} if cursor else {})
+        res = await shared_session_client.get("/v1/workout_log/user_logs", params=params, headers=headers)
+        assert res.status_code == 200
+        assert len(res.json()) <= 2
+        paged_wids += [log["wid"] for log in res.json()]
+        cursor = res.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert paged_wids == all_wids
+
+@pytest.mark.asyncio
+async def test_get_logs_invalid_cursor(temp_client: AsyncClient, test_user_login):
+    access_token = test_user_login["access_token"]
+
+    res = await temp_client.get("/v1/workout_log/user_logs",
+                                params={"cursor" : "not-a-cursor"},
+                                headers={"Authorization" : f"Bearer {access_token}"})
+    assert res.status_code == 400
+
+@pytest.mark.asyncio
+async def test_export_logs_by_user(temp_client: AsyncClient, test_user_login, test_get_logs_by_user):
+    access_token = test_user_login["access_token"]
+
+    res = await temp_client.get("/v1/workout_log/user_logs/export",
+                                headers={"Authorization" : f"Bearer {access_token}"})
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+
+    exported = [json.loads(line) for line in res.text.splitlines()]
+    assert [log["wid"] for log in exported] == [log["wid"] for log in test_get_logs_by_user]
+
+
+# The query plan checks always run on a small table. Setting PLAN_TEST_ROWS (e.g. PLAN_TEST_ROWS=1000000) adds a
+# run on a realistically sized table, seeding it takes minutes
+PLAN_SMALL_ROWS = 2000
+PLAN_TEST_ROWS = int(os.getenv("PLAN_TEST_ROWS", 0))
+PLAN_TEST_USERS = 1000
+
+@pytest_asyncio.fixture()
+async def seeded_plan_session(request):
+    # Bulk seeds users and logs inside a transaction that is rolled back, so the planner sees real statistics
+    rows = request.param
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        async with Session(bind=conn) as session:
+            if rows == PLAN_SMALL_ROWS:
+                # A sequential scan really is cheapest on a small table, with it priced out the planner still
+                # only picks an index it can use for the query
+                await session.execute(text("SET LOCAL enable_seqscan = off"))
+            await session.execute(text(
+                "INSERT INTO user_accounts (uid, username, email, password_hash, is_verified, account_creation_type) "
+                "SELECT gen_random_uuid(), 'plan_user_' || i, 'plan_user_' || i || '@example.com', '', false, 'CUSTOM' "
+                "FROM generate_series(1, :users) AS i"
+            ), {"users": PLAN_TEST_USERS})
+            await session.execute(text(
+                "WITH u AS (SELECT array_agg(uid) AS uids FROM user_accounts WHERE email LIKE 'plan\\_user\\_%'), "
+                "     e AS (SELECT array_agg(eid) AS eids, count(*) AS n FROM exercises) "
+                "INSERT INTO workout_logs (wid, user_uid, exercise_eid, reps, weight, date_performed, created_at) "
+                "SELECT gen_random_uuid(), u.uids[1 + i % :users], e.eids[1 + i % e.n], 1 + i % 12, 20 + (i * 7) % 300, "
+                "       date '2020-01-01' + (i / :users) % 2000, timestamp '2020-01-01' + i * interval '1 second' "
+                "FROM u, e, generate_series(1, :rows) AS i"
+            ), {"users": PLAN_TEST_USERS, "rows": rows})
+            await session.execute(text("ANALYZE workout_logs"))
+            await session.execute(text("ANALYZE user_accounts"))
+
+            uid = (await session.execute(text(
+                "SELECT uid FROM user_accounts WHERE email = 'plan_user_1@example.com'"
+            ))).scalar_one()
+            yield session, uid
+        await trans.rollback()
+
+async def explain_first_statement(session, call) -> dict:
+    """ Runs a service call, then EXPLAINs the first statement it sent to the database """
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    sync_engine = async_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await call()
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    statement, parameters = statements[0]
+    conn = await session.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar_one()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+def seq_scanned_relations(plan: dict) -> set:
+    relations = {plan["Relation Name"]} if plan["Node Type"] == "Seq Scan" else set()
+    for child in plan.get("Plans", []):
+        relations |= seq_scanned_relations(child)
+    return relations
+
+@pytest.mark.parametrize("seeded_plan_session", [
+    PLAN_SMALL_ROWS,
+    pytest.param(PLAN_TEST_ROWS, marks=pytest.mark.skipif(not PLAN_TEST_ROWS, reason="PLAN_TEST_ROWS not set")),
+], indirect=True, ids=["small", "large"])
+@pytest.mark.asyncio
+async def test_log_queries_use_indexes(seeded_plan_session):
+    session, uid = seeded_plan_session
+    service = WorkoutLogService()
+
+    calls = {
+        "get_pr_log_by_ex": lambda: service.get_pr_log_by_ex("bb-bench-press", uid, session),
+        "get_logs_by_day": lambda: service.get_logs_by_day(date(2021, 3, 14), session),
+        "get_logs_by_user": lambda: service.get_logs_by_user(uid, session, limit=100),
+    }
+    for name, call in calls.items():
+        plan = await explain_first_statement(session, call)
+        assert "workout_logs" not in seq_scanned_relations(plan), f"{name} sequentially scans workout_logs"
+
+@pytest.mark.asyncio
+async def test_personal_records_follow_log_writes(test_user_login, shared_session_client: AsyncClient):
+    access_token = test_user_login["access_token"]
+    headers = {"Authorization" : f"Bearer {access_token}"}
+
+    async def create(reps, weight, day):
+        res = await shared_session_client.post("/v1/workout_log/",
+                                     json={"exercise_slug" : "bb-bench-press", "reps" : reps,
+                                           "weight" : weight, "date_performed" : day},
+                                     headers=headers)
+        assert res.status_code == 201
+        return res.json()["wid"]
+
+    async def records():
+        res = await shared_session_client.get("/v1/workout_log/pr/records",
+                                    params={"exercise_slug" : "bb-bench-press"}, headers=headers)
+        assert res.status_code == 200
+        return res.json()
+
+    heavy_wid = await create(3, 500, "2025-07-01")
+    eight_wid = await create(8, 450, "2025-07-02")
+    volume_wid = await create(10, 450, "2025-07-03")
+
+    pr = await records()
+    assert pr["max_weight"]["wid"] == heavy_wid
+    assert pr["best_e1rm"]["wid"] == volume_wid
+    assert pr["best_e1rm"]["e1rm"] == pytest.approx(450 * (1 + 10 / 30))
+    assert {"weight" : 450, "reps" : 10} in [{"weight" : r["weight"], "reps" : r["reps"]} for r in pr["rep_records"]]
+
+    res = await shared_session_client.get("/v1/workout_log/pr/", params={"exercise_slug" : "bb-bench-press"}, headers=headers)
+    assert res.json()["wid"] == heavy_wid
+
+    # Deleting a record holder falls back to the next best log
+    res = await shared_session_client.delete(f"/v1/workout_log/{volume_wid}", headers=headers)
+    assert res.status_code == 204
+    pr = await records()
+    assert pr["best_e1rm"]["wid"] == eight_wid
+    assert [r["reps"] for r in pr["rep_records"] if r["weight"] == 450] == [8]
+
+    # Lowering the heaviest set hands the record to the next heaviest
+    res = await shared_session_client.patch(f"/v1/workout_log/{heavy_wid}",
+                                  json={"exercise_slug" : "bb-bench-press", "reps" : 3,
+                                        "weight" : 100, "date_performed" : "2025-07-01"},
+                                  headers=headers)
+    assert res.status_code == 200
+    pr = await records()
+    assert pr["max_weight"]["weight"] == 450
+    assert 500 not in [r["weight"] for r in pr["rep_records"]]
+
+@pytest.mark.asyncio
+async def test_create_logs_bulk(test_user_login, shared_session_client: AsyncClient):
+    access_token = test_user_login["access_token"]
+    headers = {"Authorization" : f"Bearer {access_token}"}
+
+    # Identical sets without created_at are distinct logs
+    sets = [{"exercise_slug" : "bb-bench-press", "reps" : 5, "weight" : 600, "date_performed" : "2025-08-01"}] * 3
+    sets.append({"exercise_slug" : "bb-bench-press", "reps" : 5, "weight" : 610, "date_performed" : "2025-08-01",
+                 "created_at" : "2025-08-01T18:00:00"})
+    batch = {"logs" : sets, "batch_id" : str(uuid4())}
+    res = await shared_session_client.post("/v1/workout_log/bulk", json=batch, headers=headers)
+    assert res.status_code == 201
+    assert len(res.json()["created"]) == 4
+    assert res.json()["skipped"] == 0
+    assert all(log["exercise"]["exercise_slug"] == "bb-bench-press" for log in res.json()["created"])
+    # created_at stays the insertion time unless the client sent one
+    assert all(datetime.fromisoformat(log["created_at"]).date() == date.today()
+               for log in res.json()["created"] if log["weight"] == 600)
+
+    # A retried submission is skipped entirely, as is a set resent with the same created_at
+    res = await shared_session_client.post("/v1/workout_log/bulk", json=batch, headers=headers)
+    assert res.status_code == 201
+    assert res.json() == {"created" : [], "skipped" : 4}
+    res = await shared_session_client.post("/v1/workout_log/bulk", json={"logs" : sets[-1:]}, headers=headers)
+    assert res.status_code == 201
+    assert res.json() == {"created" : [], "skipped" : 1}
+
+    # Sets without created_at need a batch_id to be deduplicated on retry
+    res = await shared_session_client.post("/v1/workout_log/bulk", json={"logs" : sets[:1]}, headers=headers)
+    assert res.status_code == 422
+
+    res = await shared_session_client.get("/v1/workout_log/pr/", params={"exercise_slug" : "bb-bench-press"}, headers=headers)
+    assert res.json()["weight"] == 610
+
+    res = await shared_session_client.post("/v1/workout_log/bulk",
+                                 json={"logs" : [{"exercise_slug" : "not-an-exercise", "reps" : 5,
+                                                  "weight" : 100, "date_performed" : "2025-08-01"}],
+                                       "batch_id" : str(uuid4())},
+                                 headers=headers)
+    assert res.status_code == 404
+
+@pytest.mark.asyncio
+async def test_delete_log_by_day_updates_personal_records(test_user_login, shared_session_client: AsyncClient):
+    access_token = test_user_login["access_token"]
+    headers = {"Authorization" : f"Bearer {access_token}"}
+
+    sets = [{"exercise_slug" : "bb-bench-press", "reps" : 1, "weight" : 900, "date_performed" : "2025-09-01"},
+            {"exercise_slug" : "bb-bench-press", "reps" : 1, "weight" : 800, "date_performed" : "2025-09-02"}]
+    res = await shared_session_client.post("/v1/workout_log/bulk", json={"logs" : sets, "batch_id" : str(uuid4())}, headers=headers)
+    assert res.status_code == 201
+
+    res = await shared_session_client.delete("/v1/workout_log/day/2025-09-01", headers=headers)
+    assert res.status_code == 204
+
+    res = await shared_session_client.get("/v1/workout_log/", params={"query_date" : "2025-09-01"}, headers=headers)
+    assert 900 not in [log["weight"] for log in res.json()]
+    res = await shared_session_client.get("/v1/workout_log/pr/", params={"exercise_slug" : "bb-bench-press"}, headers=headers)
+    assert res.json()["weight"] == 800
+
+@pytest.mark.asyncio
+async def test_create_log_for_deleted_exercise(test_user_login, shared_session_client: AsyncClient, monkeypatch):
+    headers = {"Authorization" : f"Bearer {test_user_login['access_token']}"}
+
+    # This worker's catalogue still holds an exercise that another worker has deleted
+    snapshot = await catalogue_cache.get()
+    stale = replace(snapshot, eids_by_slug=snapshot.eids_by_slug | {"deleted-exercise" : uuid4()})
+    monkeypatch.setattr(catalogue_cache, "_snapshot", stale)
+    monkeypatch.setattr(catalogue_cache, "version_check_seconds", 3600)
+
+    res = await shared_session_client.post("/v1/workout_log/",
+                                 json={"exercise_slug" : "deleted-exercise", "reps" : 5,
+                                       "weight" : 100, "date_performed" : "2025-10-01"},
+                                 headers=headers)
+    assert res.status_code == 404
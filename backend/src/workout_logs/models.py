@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Date, DateTime, Integer, String, Float, Text, func, ForeignKey
+from sqlalchemy import Column, Date, DateTime, Integer, String, Float, Text, func, ForeignKey, text
 from sqlalchemy.orm import relationship
-from sqlalchemy.schema import UniqueConstraint
+from sqlalchemy.schema import UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from src.db.base_model import BaseModel
 from uuid import uuid4
@@ -10,17 +10,33 @@ class WorkoutLog(BaseModel):
 
     __table_args__ = (
         UniqueConstraint("user_uid", "exercise_eid", "reps", "weight", "date_performed", "created_at", name="log_fingerprint"),
+        # A user's history by day (user listings, delete by day)
+        Index("ix_workout_logs_user_date", "user_uid", "date_performed",
+              postgresql_include=["exercise_eid", "reps", "weight"]),
+        # Personal records: heaviest set per user and exercise, newest first among ties
+        Index("ix_workout_logs_user_exercise_weight", "user_uid", "exercise_eid",
+              text("weight DESC"), text("date_performed DESC"),
+              postgresql_include=["reps"]),
+        # Logs of a given day across users
+        Index("ix_workout_logs_date_performed", "date_performed"),
+        # Logs of an exercise across users (delete by exercise, ON DELETE CASCADE from exercises)
+        Index("ix_workout_logs_exercise_eid", "exercise_eid"),
+        # Idempotent bulk submissions: a retried batch conflicts on its sets' positions (NULLs never conflict)
+        Index("ux_workout_logs_batch_position", "user_uid", "batch_id", "batch_position", unique=True),
     )
 
     wid = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    user_uid = Column(UUID(as_uuid=True), ForeignKey("user_accounts.uid"), nullable=False)
-    exercise_eid = Column(UUID(as_uuid=True), ForeignKey("exercises.eid"), nullable=False)
+    user_uid = Column(UUID(as_uuid=True), ForeignKey("user_accounts.uid", ondelete="CASCADE"), nullable=False)
+    exercise_eid = Column(UUID(as_uuid=True), ForeignKey("exercises.eid", ondelete="CASCADE"), nullable=False)
     
     reps = Column(Float, nullable=False)
     weight = Column(Float, nullable=False)
     notes = Column(Text, nullable=True)
     date_performed = Column(Date(), server_default=func.current_date())
     created_at = Column(DateTime(timezone=False), server_default=func.current_timestamp())
+    # Client batch id and position of a set logged through the bulk endpoint
+    batch_id = Column(UUID(as_uuid=True), nullable=True)
+    batch_position = Column(Integer, nullable=True)
     
     
     user = relationship("User", back_populates="logs", lazy="selectin")
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Response, status
 from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List
 from datetime import date
-from src.workout_logs.schemas import WorkoutLogCreate, WorkoutLogResponse, WorkoutLogUpdate
+from src.workout_logs.schemas import WorkoutLogCreate, WorkoutLogResponse, WorkoutLogUpdate, \
+    WorkoutLogBulkCreate, WorkoutLogBulkResponse
 from src.workout_logs.service import WorkoutLogService
-from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src.personal_records.schemas import PersonalRecordResponse
+from src.personal_records.service import PersonalRecordService
+from src.auth.dependencies import access_token_bearer, RoleChecker
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,39 +16,76 @@ from src.db.db import get_session
 
 workout_logs_router = APIRouter()
 workout_logs_service = WorkoutLogService()
-access_token_bearer = AccessTokenBearer()
+personal_record_service = PersonalRecordService()
 role_checker = RoleChecker(["user", "admin"])
 
+# Listing endpoints return every log unless a limit or cursor is given, they are then keyset paginated and
+# the cursor for the next page is returned in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+EXPORT_BATCH_SIZE = 500
+
 @workout_logs_router.get("/", response_model=List[WorkoutLogResponse], dependencies=[Depends(role_checker)])
 async def get_logs(
+    response: Response,
     query_date: date | None = None, 
     slug: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer)
 ):
+    if cursor and limit is None:
+        limit = DEFAULT_PAGE_LIMIT
     if query_date:
-        result = await workout_logs_service.get_logs_by_day(query_date, session)
+        return await workout_logs_service.get_logs_by_day(query_date, session)
     elif slug:
-        result = await workout_logs_service.get_logs_by_exercise(slug, session)
+        result, next_cursor = await workout_logs_service.get_logs_by_exercise(slug, session, limit, cursor)
     else:
-        result = await workout_logs_service.get_logs_all(session)
-        
+        result, next_cursor = await workout_logs_service.get_logs_all(session, limit, cursor)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return result
 
 
 # This API only exposes user logs of the user in the beared credential
 @workout_logs_router.get("/user_logs", response_model=List[WorkoutLogResponse], dependencies=[Depends(role_checker)])
 async def get_logs_by_user(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
     session: AsyncSession = Depends(get_session), 
     token_details: dict = Depends(access_token_bearer)
 ):
-    result = await workout_logs_service.get_logs_by_user(
+    if cursor and limit is None:
+        limit = DEFAULT_PAGE_LIMIT
+    result, next_cursor = await workout_logs_service.get_logs_by_user(
         UUID(token_details["user"]["uid"]), 
-        session)
-    
+        session,
+        limit,
+        cursor)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return result
 
 
+# Full history of the beared user as newline delimited JSON, streamed page by page
+@workout_logs_router.get("/user_logs/export", dependencies=[Depends(role_checker)])
+async def export_logs_by_user(
+    token_details: dict = Depends(access_token_bearer)
+):
+    uid = UUID(token_details["user"]["uid"])
+
+    async def ndjson_lines():
+        async for log in workout_logs_service.stream_logs_by_user(uid, EXPORT_BATCH_SIZE):
+            yield WorkoutLogResponse.model_validate(log).model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
 @workout_logs_router.get("/{log_id}", response_model=WorkoutLogResponse, dependencies=[Depends(role_checker)])
 async def get_log_by_id(
     log_id: UUID, 
@@ -71,6 +112,19 @@ async def get_pr_log_by_ex(
 
     return result
 
+@workout_logs_router.get("/pr/records", response_model=PersonalRecordResponse, dependencies=[Depends(role_checker)])
+async def get_personal_records(
+    exercise_slug: str,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)
+):
+    uid = UUID(token_details["user"]["uid"])
+    result = await personal_record_service.get_records_by_slug(uid, exercise_slug, session)
+    if not result:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No personal record found for this exercise")
+
+    return result
+
 @workout_logs_router.post("/", status_code=status.HTTP_201_CREATED, response_model=WorkoutLogResponse, 
                           dependencies=[Depends(role_checker)])
 async def create_log(
@@ -85,6 +139,20 @@ async def create_log(
     return new_log
 
 
+# A whole workout's sets in one request and one transaction, sets already logged are skipped
+@workout_logs_router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=WorkoutLogBulkResponse,
+                          dependencies=[Depends(role_checker)])
+async def create_logs_bulk(
+    bulk_data: WorkoutLogBulkCreate,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)
+):
+    uid = UUID(token_details["user"]["uid"])
+    created, skipped = await workout_logs_service.create_logs_bulk(bulk_data, uid, session)
+
+    return {"created" : created, "skipped" : skipped}
+
+
 @workout_logs_router.patch("/{wid}", response_model=WorkoutLogResponse, dependencies=[Depends(role_checker)])
 async def update_log(
     wid: UUID, 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import date, datetime
 from src.exercise.schemas import ExerciseBase
 from typing import List, ClassVar, Set
@@ -33,7 +33,8 @@ class WorkoutLogResponse(WorkoutLogBase):
                 'exercise_slug' : v.exercise_slug,
                 'meta_data' : v.meta_data
             }
-        
+        return v
+
     
 # Schema for updating is same as creation but without updated_at field
 class WorkoutLogUpdate(BaseModel):
@@ -44,4 +45,25 @@ class WorkoutLogUpdate(BaseModel):
     notes: str | None = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Upper bound on sets per bulk request, keeps the multi-row INSERT well under the driver's bind parameter limit
+MAX_BULK_LOGS = 500
+
+class WorkoutLogBulkCreate(BaseModel):
+    logs: List[WorkoutLogCreate] = Field(min_length=1, max_length=MAX_BULK_LOGS)
+    # Client generated id of the submission, resent unchanged on retries. It is stored with each set's
+    # position, a retry conflicts on them and its sets are skipped
+    batch_id: UUID | None = None
+
+    @model_validator(mode='after')
+    def require_created_at_or_batch_id(self):
+        if self.batch_id is None and any(log.created_at is None for log in self.logs):
+            raise ValueError("batch_id is required when a set has no created_at")
+        return self
+
+class WorkoutLogBulkResponse(BaseModel):
+    created: List[WorkoutLogResponse]
+    # Sets already stored: at the same position of a submission with the same batch_id, or with the same
+    # log_fingerprint (same created_at)
+    skipped: int
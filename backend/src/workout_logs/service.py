@@ -2,25 +2,113 @@ from fastapi import status
 from fastapi.exceptions import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.workout_logs.models import WorkoutLog
-from src.workout_logs.schemas import WorkoutLogCreate, WorkoutLogUpdate
+from src.workout_logs.schemas import WorkoutLogCreate, WorkoutLogUpdate, WorkoutLogBulkCreate
 from src.exercise.models import Exercise
 from src.exercise.service import ExerciseService
-from sqlalchemy import select, desc
+from src.db.db import get_session_context
+from src.personal_records.models import PersonalRecord
+from src.personal_records.service import PersonalRecordService
+from src.daily_rollups.service import DailyRollupService
+from src.analytics.user_context import user_context_cache
+from sqlalchemy import select, delete, and_, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload, joinedload
-from datetime import date
-from uuid import UUID
-from typing import List
+from datetime import date, datetime, timedelta
+from uuid import UUID, uuid4
+from typing import List, AsyncGenerator
+import base64
+from types import SimpleNamespace
+import json
+
+# Listing columns only, so pages are built from flat rows instead of hydrated WorkoutLog/User objects
+LOG_LISTING_COLUMNS = (
+    WorkoutLog.wid,
+    WorkoutLog.user_uid,
+    WorkoutLog.reps,
+    WorkoutLog.weight,
+    WorkoutLog.date_performed,
+    WorkoutLog.created_at,
+    WorkoutLog.notes,
+    Exercise.exercise_slug,
+    Exercise.exercise_name,
+    Exercise.meta_data,
+)
+
+
+def encode_log_cursor(row: dict) -> str:
+    # Opaque keyset cursor over (date_performed, exercise_slug, wid) of the last row in a page
+    key = [row["date_performed"].isoformat(), row["exercise"]["exercise_slug"], str(row["wid"])]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_log_cursor(cursor: str) -> tuple[date, str, UUID]:
+    try:
+        date_performed, exercise_slug, wid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date.fromisoformat(date_performed), exercise_slug, UUID(wid)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+
+personal_record_service = PersonalRecordService()
+daily_rollup_service = DailyRollupService()
+
 
 class WorkoutLogService:
-    async def get_logs_all(self, session: AsyncSession):
-        statement = select(WorkoutLog)\
+    @staticmethod
+    def _listing_statement(*filters):
+        # Keyset order, wid breaks ties between sets of the same exercise on the same day
+        return select(*LOG_LISTING_COLUMNS)\
             .join(WorkoutLog.exercise)\
-            .options(selectinload(WorkoutLog.exercise))\
-            .order_by(WorkoutLog.date_performed.desc(), 
-                      Exercise.exercise_slug.asc())
+            .where(*filters)\
+            .order_by(WorkoutLog.date_performed.desc(),
+                      Exercise.exercise_slug.asc(),
+                      WorkoutLog.wid.asc())
+
+    @staticmethod
+    def _row_to_log(row) -> dict:
+        return {
+            "wid": row.wid,
+            "user_uid": row.user_uid,
+            "reps": row.reps,
+            "weight": row.weight,
+            "date_performed": row.date_performed,
+            "created_at": row.created_at,
+            "notes": row.notes,
+            "exercise": {
+                "exercise_slug": row.exercise_slug,
+                "exercise_name": row.exercise_name,
+                "meta_data": row.meta_data,
+            },
+        }
+
+    async def _get_log_page(self, filters: list, session: AsyncSession,
+                            limit: int | None = None, cursor: str | None = None) -> tuple[List[dict], str | None]:
+        """ Returns (logs, next_cursor), next_cursor is None on the last page or when limit is None """
+        if cursor:
+            date_performed, exercise_slug, wid = decode_log_cursor(cursor)
+            # date_performed is descending while (exercise_slug, wid) is ascending
+            filters = [*filters, or_(
+                WorkoutLog.date_performed < date_performed,
+                and_(WorkoutLog.date_performed == date_performed,
+                     tuple_(Exercise.exercise_slug, WorkoutLog.wid) > tuple_(exercise_slug, wid))
+            )]
+
+        statement = self._listing_statement(*filters)
+        if limit is not None:
+            # One extra row tells us whether another page exists
+            statement = statement.limit(limit + 1)
+
         result = await session.execute(statement)
+        logs = [self._row_to_log(row) for row in result]
 
-        return result.scalars().all()
+        if limit is None or len(logs) <= limit:
+            return logs, None
+
+        logs = logs[:limit]
+        return logs, encode_log_cursor(logs[-1])
+
+    async def get_logs_all(self, session: AsyncSession, limit: int | None = None, cursor: str | None = None):
+        return await self._get_log_page([], session, limit, cursor)
 
     async def get_logs_by_day(self, query_date: date, session: AsyncSession):
         statement = select(WorkoutLog)\
@@ -32,15 +120,9 @@ class WorkoutLogService:
 
         return result.scalars().all()
 
-    async def get_logs_by_exercise(self, exercise_slug: str, session: AsyncSession):
-        statement = select(WorkoutLog)\
-            .join(WorkoutLog.exercise)\
-            .options(selectinload(WorkoutLog.exercise))\
-            .where(Exercise.exercise_slug == exercise_slug)\
-            .order_by(WorkoutLog.date_performed.desc())
-        result = await session.execute(statement)
-
-        return result.scalars().all()
+    async def get_logs_by_exercise(self, exercise_slug: str, session: AsyncSession,
+                                   limit: int | None = None, cursor: str | None = None):
+        return await self._get_log_page([Exercise.exercise_slug == exercise_slug], session, limit, cursor)
     
     async def get_log_by_id(self, id: UUID, session: AsyncSession):
         statement = select(WorkoutLog)\
@@ -50,25 +132,31 @@ class WorkoutLogService:
 
         return result.scalars().first()
     
-    async def get_logs_by_user(self, user_id: UUID, session: AsyncSession):
-        statement = select(WorkoutLog)\
-            .join(WorkoutLog.exercise)\
-            .options(selectinload(WorkoutLog.exercise))\
-            .where(WorkoutLog.user_uid == user_id)\
-            .order_by(WorkoutLog.date_performed.desc(),
-                      Exercise.exercise_slug.asc())
-        result = await session.execute(statement)
+    async def get_logs_by_user(self, user_id: UUID, session: AsyncSession,
+                               limit: int | None = None, cursor: str | None = None):
+        return await self._get_log_page([WorkoutLog.user_uid == user_id], session, limit, cursor)
 
-        return result.scalars().all()
+    async def stream_logs_by_user(self, user_id: UUID, batch_size: int) -> AsyncGenerator[dict, None]:
+        """
+        Yields every log of a user, one keyset page at a time. Each page runs in its own short-lived
+        session so a long export never pins a pooled connection or holds more than one page in memory.
+        """
+        cursor = None
+        while True:
+            async with get_session_context() as session:
+                logs, cursor = await self.get_logs_by_user(user_id, session, batch_size, cursor)
+            for log in logs:
+                yield log
+            if not cursor:
+                return
     
     async def get_pr_log_by_ex(self, exercise_slug: str, uid: UUID, session: AsyncSession):
+        # Heaviest set is materialized in personal_records, so this is a primary key lookup
         statement = select(WorkoutLog)\
+            .join(PersonalRecord, PersonalRecord.max_weight_wid == WorkoutLog.wid)\
             .join(WorkoutLog.exercise)\
             .options(selectinload(WorkoutLog.exercise))\
-            .where(WorkoutLog.user_uid == uid, Exercise.exercise_slug == exercise_slug)\
-            .order_by(desc(WorkoutLog.weight), 
-                      desc(WorkoutLog.date_performed))\
-            .limit(1)
+            .where(PersonalRecord.user_uid == uid, Exercise.exercise_slug == exercise_slug)
         
         result = await session.execute(statement)
 
@@ -84,11 +172,66 @@ class WorkoutLogService:
         new_log = WorkoutLog(**log_dict)
 
         session.add(new_log)
+        try:
+            await session.flush()
+        except IntegrityError as e:
+            await ExerciseService.raise_if_exercise_deleted(log_data.exercise_slug, e, session)
+            raise
+        await personal_record_service.record_log(new_log, session)
+        await daily_rollup_service.refresh_days([(uid, new_log.exercise_eid, new_log.date_performed)], session)
         await session.commit()
+        await user_context_cache.invalidate(uid)
         await session.refresh(new_log)
 
         return new_log
 
+    async def create_logs_bulk(self, bulk_data: WorkoutLogBulkCreate, uid: UUID, session: AsyncSession):
+        """
+        Inserts a whole session's sets with one multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING.
+        Returns (created_logs, skipped_count). Sets already stored at the same position of a batch with the
+        same batch_id, or matching an existing log_fingerprint, are skipped.
+        """
+        exercises = await ExerciseService.get_exercise_columns_by_slugs(
+            [log.exercise_slug for log in bulk_data.logs], session)
+        missing = sorted({log.exercise_slug for log in bulk_data.logs} - exercises.keys())
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"Exercise does not exist: {', '.join(missing)}")
+
+        # Sets without created_at get distinct insertion times so identical sets within one workout
+        # (e.g. 3 x 5 @ 100) do not collide on log_fingerprint
+        now = datetime.now()
+        rows = []
+        for i, log in enumerate(bulk_data.logs):
+            log_dict = log.model_dump()
+            log_dict["wid"] = uuid4()
+            log_dict["user_uid"] = uid
+            log_dict["exercise_eid"] = exercises[log_dict.pop("exercise_slug")].eid
+            if log_dict["created_at"] is None:
+                log_dict["created_at"] = now + timedelta(microseconds=i)
+            log_dict["batch_id"] = bulk_data.batch_id
+            log_dict["batch_position"] = i if bulk_data.batch_id else None
+            rows.append(log_dict)
+
+        # No conflict target: both log_fingerprint and ux_workout_logs_batch_position skip a set
+        statement = insert(WorkoutLog).values(rows)\
+            .on_conflict_do_nothing()\
+            .returning(WorkoutLog.wid, WorkoutLog.user_uid, WorkoutLog.exercise_eid, WorkoutLog.reps,
+                       WorkoutLog.weight, WorkoutLog.date_performed, WorkoutLog.created_at, WorkoutLog.notes)
+        inserted = (await session.execute(statement)).all()
+
+        await personal_record_service.record_logs(inserted, session)
+        await daily_rollup_service.refresh_days(
+            [(row.user_uid, row.exercise_eid, row.date_performed) for row in inserted], session)
+        await session.commit()
+        await user_context_cache.invalidate(uid)
+
+        exercises_by_eid = {exercise.eid: exercise for exercise in exercises.values()}
+        created = [self._row_to_log(SimpleNamespace(**row._asdict(), **exercises_by_eid[row.exercise_eid]._asdict()))
+                   for row in inserted]
+
+        return created, len(rows) - len(inserted)
+
     async def update_log(self, wid: UUID, log_data: WorkoutLogUpdate, session: AsyncSession):
         log = await self.get_log_by_id(wid, session)
 
@@ -97,9 +240,19 @@ class WorkoutLogService:
         log_dict.pop("exercise_slug")
         log_dict.pop("date_performed")
         
+        old_exercise_eid = log.exercise_eid
         for k, v in log_dict.items():
             setattr(log, k, v)
+        try:
+            await session.flush()
+        except IntegrityError as e:
+            await ExerciseService.raise_if_exercise_deleted(log_data.exercise_slug, e, session)
+            raise
+        await personal_record_service.update_log(log, old_exercise_eid, session)
+        await daily_rollup_service.refresh_days([(log.user_uid, old_exercise_eid, log.date_performed),
+                                                 (log.user_uid, log.exercise_eid, log.date_performed)], session)
         await session.commit()
+        await user_context_cache.invalidate(log.user_uid)
         await session.refresh(log)
 
         return log
@@ -135,19 +288,24 @@ class WorkoutLogService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                     detail="Log not found.")
         await session.delete(log)
+        await session.flush()
+        await personal_record_service.remove_logs([(log.user_uid, log.exercise_eid, log.wid)], session)
+        await daily_rollup_service.refresh_days([(log.user_uid, log.exercise_eid, log.date_performed)], session)
         await session.commit()
+        await user_context_cache.invalidate(log.user_uid)
 
         return
     
     async def delete_logs_by_day(self, date: date, uid: UUID, session: AsyncSession):
-        statement = select(WorkoutLog).where(WorkoutLog.date_performed == date,
-                                             WorkoutLog.user_uid == uid)
-        result = await session.execute(statement)
-        logs = result.scalars().all()
+        statement = delete(WorkoutLog)\
+            .where(WorkoutLog.date_performed == date, WorkoutLog.user_uid == uid)\
+            .returning(WorkoutLog.user_uid, WorkoutLog.exercise_eid, WorkoutLog.wid)
+        deleted = (await session.execute(statement)).all()
 
-        for log in logs:
-            await session.delete(log)
+        await personal_record_service.remove_logs([tuple(row) for row in deleted], session)
+        await daily_rollup_service.refresh_days([(row.user_uid, row.exercise_eid, date) for row in deleted], session)
         await session.commit()
+        await user_context_cache.invalidate(uid)
 
         return
     
@@ -162,28 +320,3 @@ class WorkoutLogService:
         # await session.delete(log)
         # await session.commit()
         # return
-
-    @classmethod
-    async def delete_log_by_exercise_slug(cls, exercise_slug: str, session: AsyncSession):
-        statement = select(WorkoutLog).join(WorkoutLog.exercise)\
-            .where(Exercise.exercise_slug == exercise_slug)
-        result = await session.execute(statement)
-        logs = result.scalars().all()
-
-        for log in logs:
-            await session.delete(log)
-        await session.commit()
-
-        return
-
-    @classmethod
-    async def delete_log_by_user_id(cls, uid: UUID, session: AsyncSession):
-        statement = select(WorkoutLog).where(WorkoutLog.user_uid == uid)
-        result = await session.execute(statement)
-        logs = result.scalars().all()
-
-        for log in logs:
-            await session.delete(log)
-        await session.commit()
-
-        return
\ No newline at end of file